@@ -0,0 +1,249 @@
+# backend/benchmarks/api_suite.py
+#
+# End-to-end benchmark of the hot API paths (login, my-resumes, match, search,
+# upload-multiple) at several corpus sizes and concurrency levels. The app from
+# main.py runs under uvicorn in a background thread against an in-memory
+# mongomock database (or a real MongoDB with --mongo-uri) and the local fake
+# OpenAI server, so results are reproducible and need no network.
+#
+#   pip install -r benchmarks/requirements.txt
+#   cd backend && python -m benchmarks.api_suite --corpus 100,1000 --concurrency 1,8,32
+#   cd backend && python -m benchmarks.api_suite --scenarios match,my-resumes --json results.json
+#
+# Client and server share one process, so absolute numbers are lower than a real
+# deployment; compare runs of the suite with each other to catch regressions.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import threading
+import time
+
+SCENARIOS = ["login", "my-resumes", "match", "match-matrix", "search", "upload-multiple"]
+PASSWORD = "bench-password"
+SEED_UPLOAD_SIZE = 20
+SEED_CONCURRENCY = 4
+
+def load_app(args):
+    """Point the backend at the benchmark database and fake OpenAI, then import main.app."""
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{args.openai_port}/v1"
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+        os.environ["MONGO_DB_NAME"] = args.mongo_db
+
+    import db
+    if args.mongo_uri:
+        # Start from an empty benchmark database
+        db.client.drop_database(args.mongo_db)
+    else:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("mongomock is required without --mongo-uri: pip install -r benchmarks/requirements.txt")
+        # Must happen before the routers import `db` from the db module
+        db.db = mongomock.MongoClient()[db.MONGO_DB_NAME]
+
+    import main
+    return main.app
+
+def start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+async def measure(send, requests: int, concurrency: int) -> dict:
+    """Issue `requests` calls of send(i) with at most `concurrency` in flight."""
+    import httpx
+
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+class BenchUser:
+    """A benchmark user with a corpus of resumes and jobs."""
+
+    def __init__(self, client, username: str):
+        self.client = client
+        self.username = username
+        self.headers = {}
+        self.job_ids = []
+
+    async def login(self):
+        return await self.client.post(
+            "/users/login", data={"username": self.username, "password": PASSWORD}
+        )
+
+    async def setup(self, rng: random.Random, resumes: int, jobs: int):
+        from benchmarks.corpus import make_job_description
+
+        await self.client.post("/users/register", json={"username": self.username, "password": PASSWORD})
+        response = await self.login()
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        semaphore = asyncio.Semaphore(SEED_CONCURRENCY)
+
+        async def seed(count):
+            async with semaphore:
+                (await self.upload(rng, count)).raise_for_status()
+
+        sizes = [SEED_UPLOAD_SIZE] * (resumes // SEED_UPLOAD_SIZE)
+        if resumes % SEED_UPLOAD_SIZE:
+            sizes.append(resumes % SEED_UPLOAD_SIZE)
+        await asyncio.gather(*(seed(count) for count in sizes))
+
+        for _ in range(jobs):
+            response = await self.client.post(
+                "/jobs/create-job",
+                headers=self.headers,
+                json={"title": "Benchmark job", "description": make_job_description(rng)}
+            )
+            response.raise_for_status()
+            self.job_ids.append(response.json()["job_id"])
+
+    async def upload(self, rng: random.Random, count: int):
+        from benchmarks.corpus import make_pdf, make_resume
+
+        files = [
+            ("files", (f"resume-{rng.randint(0, 10**9)}.pdf", make_pdf(make_resume(rng)), "application/pdf"))
+            for _ in range(count)
+        ]
+        return await self.client.post("/resumes/upload-multiple", headers=self.headers, files=files)
+
+    def scenario(self, name: str, rng: random.Random, files_per_upload: int):
+        """Return an async send(i) function for a scenario."""
+        if name == "login":
+            return lambda i: self.login()
+        if name == "my-resumes":
+            return lambda i: self.client.get("/resumes/my-resumes", headers=self.headers, params={"limit": 50})
+        if name in ("match", "match-matrix"):
+            engine = "matrix" if name == "match-matrix" else "index"
+            return lambda i: self.client.post(
+                f"/jobs/match/{self.job_ids[i % len(self.job_ids)]}",
+                headers=self.headers,
+                params={"limit": 50, "engine": engine}
+            )
+        if name == "search":
+            from benchmarks.fake_openai import KNOWN_SKILLS
+            return lambda i: self.client.get(
+                "/resumes/search",
+                headers=self.headers,
+                params={"q": " AND ".join(rng.sample(KNOWN_SKILLS, 2)), "limit": 20}
+            )
+        if name == "upload-multiple":
+            return lambda i: self.upload(rng, files_per_upload)
+        raise ValueError(f"Unknown scenario {name}")
+
+async def run_suite(args) -> list:
+    import httpx
+
+    rng = random.Random(args.seed)
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency) + SEED_CONCURRENCY)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{args.port}", timeout=300, limits=limits
+    ) as client:
+        for corpus in args.corpus:
+            user = BenchUser(client, f"bench-{corpus}")
+            start = time.perf_counter()
+            await user.setup(rng, corpus, args.jobs)
+            print(f"\ncorpus {corpus} resumes, {args.jobs} jobs (seeded in {time.perf_counter() - start:.1f}s)")
+            print(f"{'scenario':>16} {'conc':>5} {'reqs':>5} {'errors':>6} {'req/s':>8} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            # Uploads grow the corpus, so they run last
+            for name in sorted(args.scenarios, key=SCENARIOS.index):
+                send = user.scenario(name, rng, args.files_per_upload)
+                for concurrency in args.concurrency:
+                    result = await measure(send, args.requests, concurrency)
+                    result.update(scenario=name, corpus=corpus, concurrency=concurrency)
+                    results.append(result)
+                    print(f"{name:>16} {concurrency:>5} {result['requests']:>5} {result['errors']:>6} "
+                          f"{result['throughput']:>8.1f} {result['p50_ms']:>8.1f} "
+                          f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+    return results
+
+def parse_list(value: str, item=int) -> list:
+    return [item(part) for part in value.split(",") if part]
+
+def main():
+    parser = argparse.ArgumentParser(description="API latency/throughput benchmark suite")
+    parser.add_argument("--scenarios", type=lambda v: parse_list(v, str), default=SCENARIOS,
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--corpus", type=parse_list, default=[100, 1000], help="resumes per user, e.g. 100,1000")
+    parser.add_argument("--concurrency", type=parse_list, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and concurrency level")
+    parser.add_argument("--jobs", type=int, default=20, help="jobs created per corpus")
+    parser.add_argument("--files-per-upload", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="fake OpenAI latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--port", type=int, default=8021)
+    parser.add_argument("--openai-port", type=int, default=8022)
+    parser.add_argument("--mongo-uri", help="use this MongoDB instead of mongomock (the benchmark database is dropped)")
+    parser.add_argument("--mongo-db", default="resume_screener_bench")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    from benchmarks.fake_openai import start_in_thread
+    fake_server, fake = start_in_thread(args.openai_port, args.latency_ms, args.jitter_ms)
+    app = load_app(args)
+    server, thread = start_server(app, args.port)
+    print(f"fake OpenAI latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"database {'mongomock' if not args.mongo_uri else args.mongo_db}")
+
+    try:
+        results = asyncio.run(run_suite(args))
+    finally:
+        server.should_exit = True
+        thread.join()
+        fake_server.should_exit = True
+
+    print(f"\nfake OpenAI: {fake.state.stats}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
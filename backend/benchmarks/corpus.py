@@ -0,0 +1,55 @@
+# backend/benchmarks/corpus.py
+#
+# Synthetic resumes and job descriptions for the benchmarks, plus a tiny PDF
+# writer so uploads can be generated without extra dependencies.
+
+import random
+from benchmarks.fake_openai import KNOWN_SKILLS
+
+FILLER = (
+    "Responsible for delivering projects on time, collaborating with stakeholders "
+    "and mentoring junior engineers. "
+)
+
+def make_resume(rng: random.Random) -> str:
+    skills = rng.sample(KNOWN_SKILLS, rng.randint(3, 10))
+    return f"Candidate {rng.randint(0, 10**9)}\nSkills: {', '.join(skills)}\n" + FILLER * rng.randint(2, 8)
+
+def make_job_description(rng: random.Random) -> str:
+    skills = rng.sample(KNOWN_SKILLS, rng.randint(3, 8))
+    return f"We are hiring an engineer with experience in {', '.join(skills)}."
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(text: str) -> bytes:
+    """A single-page PDF with one line of Helvetica text per input line (long lines are wrapped)."""
+    lines = []
+    for line in text.splitlines():
+        while len(line) > 90:
+            cut = line.rfind(" ", 0, 90)
+            cut = cut if cut > 0 else 90
+            lines.append(line[:cut])
+            line = line[cut:].lstrip()
+        lines.append(line)
+    body = " T* ".join(f"({_escape(line)}) Tj" for line in lines[:60])
+    stream = f"BT /F1 10 Tf 12 TL 40 760 Td {body} ET".encode("latin-1", "replace")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
@@ -0,0 +1,95 @@
+# backend/benchmarks/fake_openai.py
+#
+# Local stand-in for the OpenAI chat completions API, for offline tests and
+# benchmarks. It "extracts" skills by keyword lookup and answers both the
+# single-document prompt (JSON array) and the batch prompt (JSON object by doc ID).
+#
+#   cd backend && python -m benchmarks.fake_openai --port 8001 --latency-ms 300
+#   OPENAI_API_BASE=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+
+KNOWN_SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "c++", "sql", "postgresql",
+    "mysql", "mongodb", "redis", "react", "angular", "vue", "node.js", "django", "flask",
+    "fastapi", "spring", "docker", "kubernetes", "terraform", "aws", "gcp", "azure", "linux",
+    "git", "graphql", "kafka", "spark", "pandas", "numpy", "pytorch", "tensorflow",
+    "machine learning", "excel", "tableau", "figma", "agile",
+]
+
+_DOC = re.compile(r"<doc id=\"([^\"]+)\">\n(.*?)\n</doc>", re.S)
+_SKILL_PATTERNS = [(skill, re.compile(r"(?<![\w+#.])" + re.escape(skill) + r"(?![\w+#])")) for skill in KNOWN_SKILLS]
+
+def find_skills(text: str) -> list:
+    lowered = text.lower()
+    return [skill for skill, pattern in _SKILL_PATTERNS if pattern.search(lowered)]
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        content = body["messages"][-1]["content"]
+        docs = _DOC.findall(content)
+        if docs:
+            reply = json.dumps({doc_id: find_skills(text) for doc_id, text in docs})
+        else:
+            reply = json.dumps(find_skills(content))
+
+        prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+        completion_tokens = len(reply) // 4
+        stats = app.state.stats
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"chatcmpl-fake-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    def get_stats():
+        return app.state.stats
+
+    return app
+
+def start_in_thread(port: int = 8001, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+    """Run the fake server in a daemon thread. Returns (server, app); stop with server.should_exit = True."""
+    app = create_app(latency_ms, jitter_ms)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms), host="127.0.0.1", port=args.port)
@@ -0,0 +1,57 @@
+# backend/benchmarks/llm_batching_throughput.py
+#
+# Compares one-request-per-document skill extraction with batched extraction
+# against the local fake OpenAI server (no network, no database needed).
+#
+#   cd backend && python -m benchmarks.llm_batching_throughput --documents 100 --latency-ms 300
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ["SKILL_CACHE_ENABLED"] = "false"
+os.environ.setdefault("OPENAI_API_KEY", "fake")
+
+import llm_batching
+import llm_client
+from benchmarks.corpus import make_resume
+from benchmarks.fake_openai import start_in_thread
+
+async def run(texts: list, max_documents: int, concurrency: int) -> float:
+    llm_batching.SKILL_BATCH_MAX_DOCUMENTS = max_documents
+    start = time.perf_counter()
+    results = await llm_batching.extract_skills_batched(texts, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    await llm_client.close()
+    failures = sum(isinstance(r, Exception) for r in results)
+    assert not failures, f"{failures} documents failed"
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched vs single-document skill extraction")
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    server, fake = start_in_thread(args.port, args.latency_ms)
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{args.port}/v1"
+    rng = random.Random(0)
+    texts = [make_resume(rng) for _ in range(args.documents)]
+
+    print(f"{args.documents} documents, {args.latency_ms:.0f} ms simulated latency, "
+          f"concurrency {args.concurrency}")
+    print(f"{'mode':>10} {'requests':>9} {'seconds':>8} {'docs/s':>8}")
+    for mode, max_documents in (("single", 1), ("batched", llm_batching.SKILL_BATCH_MAX_DOCUMENTS)):
+        before = fake.state.stats["requests"]
+        elapsed = asyncio.run(run(texts, max_documents, args.concurrency))
+        requests = fake.state.stats["requests"] - before
+        print(f"{mode:>10} {requests:>9} {elapsed:>8.2f} {args.documents / elapsed:>8.1f}")
+
+    server.should_exit = True
+
+if __name__ == "__main__":
+    main()
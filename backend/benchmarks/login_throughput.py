@@ -0,0 +1,54 @@
+# backend/benchmarks/login_throughput.py
+#
+# Measures how many password verifications (the CPU-bound part of /users/login)
+# the bcrypt executor sustains at different request concurrency levels.
+#
+#   cd backend && python -m benchmarks.login_throughput --requests 200 --concurrency 1,4,16,64
+
+import argparse
+import asyncio
+import statistics
+import time
+import password_hashing
+
+async def run_level(hashed: str, concurrency: int, requests: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            valid, _ = await password_hashing.verify_password("correct horse", hashed)
+            latencies.append(time.perf_counter() - start)
+            assert valid
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    hashed = await password_hashing.hash_password("correct horse")
+    print(f"bcrypt rounds={password_hashing.BCRYPT_ROUNDS} "
+          f"executor threads={password_hashing.PASSWORD_HASH_CONCURRENCY}")
+    print(f"{'concurrency':>11} {'logins/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for level in (int(c) for c in args.concurrency.split(",")):
+        result = await run_level(hashed, level, args.requests)
+        print(f"{result['concurrency']:>11} {result['throughput']:>10.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}")
+    password_hashing.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,264 @@
+# backend/bulk_operations.py
+
+import asyncio
+import csv
+import io
+import math
+import os
+from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+import repositories
+import skill_registry
+import skill_index
+import match_results
+import resume_blobs
+import llm_client
+import metrics
+from task_queue import enqueue_task, task_handler, update_progress
+from extract_skills import JOB_PROMPT, JOB_PROMPT_VERSION, extract_job_skills_from_text
+from llm_batching import estimate_tokens, resolve_without_llm, batch_request_tokens, extract_skills_batched
+from embeddings import skill_embedding_fields
+
+# Bulk job creation and bulk skill re-extraction, run as background tasks (see
+# task_queue). Work goes in chunks of BULK_CHUNK_SIZE: skills are extracted
+# with at most BULK_CONCURRENCY OpenAI requests in flight, the chunk is written
+# with one bulk_write and indexed, then progress and a checkpoint are recorded
+# together. A task picked up again after a crash or a shutdown continues after
+# its last checkpoint; redoing the chunk in flight is harmless because its
+# writes are keyed by _id.
+# Both endpoints take dry_run=true to get the request count, token, cost and
+# time estimate without doing anything.
+
+BULK_JOB_LIMIT = int(os.getenv("BULK_JOB_LIMIT", "1000"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "200"))
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "8"))
+# Prices of SKILL_MODEL in USD, for dry-run estimates
+LLM_INPUT_COST_PER_1K_TOKENS = float(os.getenv("LLM_INPUT_COST_PER_1K_TOKENS", "0.0005"))
+LLM_OUTPUT_COST_PER_1K_TOKENS = float(os.getenv("LLM_OUTPUT_COST_PER_1K_TOKENS", "0.0015"))
+# Assumed request latency until this process has timed real OpenAI requests
+LLM_ESTIMATED_LATENCY_SECONDS = float(os.getenv("LLM_ESTIMATED_LATENCY_SECONDS", "3"))
+# Completion tokens of one document's skill list
+SKILL_LIST_TOKENS = 60
+
+CREATE_JOBS_TASK = "create_jobs"
+REEXTRACT_TASK = "reextract_resume_skills"
+
+def _estimate(counts: dict, request_tokens: list, concurrency: int) -> dict:
+    """Dry-run report for documents classified by llm_batching.resolve_without_llm."""
+    requests = len(request_tokens)
+    input_tokens = sum(request_tokens)
+    output_tokens = counts.get("pending", 0) * SKILL_LIST_TOKENS
+    latency = metrics.STAGE_DURATION.mean("openai") or LLM_ESTIMATED_LATENCY_SECONDS
+    seconds = math.ceil(requests / concurrency) * latency
+    # Configured account limits can make the run slower than the concurrency allows
+    if llm_client.LLM_REQUESTS_PER_MINUTE:
+        seconds = max(seconds, requests / llm_client.LLM_REQUESTS_PER_MINUTE * 60)
+    if llm_client.LLM_TOKENS_PER_MINUTE:
+        seconds = max(seconds, (input_tokens + output_tokens) / llm_client.LLM_TOKENS_PER_MINUTE * 60)
+    return {
+        "dry_run": True,
+        "documents": sum(counts.values()),
+        "empty": counts.get("empty", 0),
+        "local": counts.get("local", 0),
+        "cached": counts.get("cached", 0),
+        "to_extract": counts.get("pending", 0),
+        "llm_requests": requests,
+        "estimated_input_tokens": input_tokens,
+        "estimated_output_tokens": output_tokens,
+        "estimated_cost_usd": round(
+            input_tokens / 1000 * LLM_INPUT_COST_PER_1K_TOKENS + output_tokens / 1000 * LLM_OUTPUT_COST_PER_1K_TOKENS, 4
+        ),
+        "estimated_seconds": round(seconds, 1),
+        "concurrency": concurrency,
+    }
+
+async def _bounded(func, args: list, concurrency: int) -> list:
+    """await func(arg) for every arg, at most `concurrency` at a time; exceptions are returned."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(arg):
+        async with semaphore:
+            return await func(arg)
+
+    return await asyncio.gather(*(run(arg) for arg in args), return_exceptions=True)
+
+def _error_detail(error: Exception) -> str:
+    return str(getattr(error, "detail", error))
+
+# ---- bulk job creation ----
+
+def validate_jobs(jobs) -> list:
+    """Check a parsed payload and return it as [{"title", "description"}]. Raises ValueError."""
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError("Expected a non-empty list of jobs")
+    if len(jobs) > BULK_JOB_LIMIT:
+        raise ValueError(f"At most {BULK_JOB_LIMIT} jobs per request, got {len(jobs)}")
+    cleaned = []
+    for number, job in enumerate(jobs, 1):
+        title = job.get("title") if isinstance(job, dict) else None
+        description = job.get("description") if isinstance(job, dict) else None
+        if not isinstance(title, str) or not title.strip() or not isinstance(description, str) or not description.strip():
+            raise ValueError(f"Job {number} needs a non-empty 'title' and 'description'")
+        cleaned.append({"title": title.strip(), "description": description})
+    return cleaned
+
+def parse_jobs_csv(content: bytes) -> list:
+    """Jobs from CSV with a header row that has 'title' and 'description' columns. Raises ValueError."""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    columns = {name.strip().lower(): name for name in reader.fieldnames or [] if name}
+    missing = [column for column in ("title", "description") if column not in columns]
+    if missing:
+        raise ValueError(f"CSV header is missing the column(s): {', '.join(missing)}")
+    return validate_jobs([
+        {"title": row[columns["title"]], "description": row[columns["description"]]} for row in reader
+    ])
+
+async def estimate_job_creation(jobs: list) -> dict:
+    """Dry run of create_jobs_task: one request per job whose skills aren't cached or local."""
+    descriptions = [job["description"] for job in jobs]
+    counts = {}
+    _, pending = await resolve_without_llm(descriptions, JOB_PROMPT_VERSION, counts)
+    request_tokens = [estimate_tokens(JOB_PROMPT) + estimate_tokens(descriptions[i]) for i in pending]
+    return _estimate(counts, request_tokens, BULK_CONCURRENCY)
+
+def enqueue_job_creation(jobs: list, current_user: dict) -> tuple:
+    """Queue the creation of validated jobs. Returns (task ID, job IDs in input order)."""
+    for job in jobs:
+        # Assigned up front so the IDs can be returned now and a retried chunk
+        # replaces its jobs instead of duplicating them
+        job["_id"] = ObjectId()
+    task_id = enqueue_task(
+        CREATE_JOBS_TASK,
+        str(current_user["_id"]),
+        {"jobs": jobs, "username": current_user["username"]},
+        total=len(jobs)
+    )
+    return task_id, [str(job["_id"]) for job in jobs]
+
+def _store_jobs(user_id: str, job_docs: list):
+    for doc in job_docs:
+        doc["required_skill_ids"] = skill_registry.skill_ids(doc["required_skills"])
+    repositories.put_jobs(job_docs)
+    match_results.build_jobs(user_id, [(doc["_id"], set(doc["required_skill_ids"])) for doc in job_docs])
+
+@task_handler(CREATE_JOBS_TASK)
+async def create_jobs_task(task: dict):
+    """
+    Background task: create the jobs in the payload the way /create-job does,
+    chunk by chunk. The checkpoint is the number of jobs done.
+    """
+    user_id = task["user_id"]
+    jobs = task["payload"]["jobs"]
+    for start in range(task.get("checkpoint", 0), len(jobs), BULK_CHUNK_SIZE):
+        chunk = jobs[start:start + BULK_CHUNK_SIZE]
+        with metrics.timed("job_skill_extraction"):
+            all_skills = await _bounded(
+                extract_job_skills_from_text, [job["description"] for job in chunk], BULK_CONCURRENCY
+            )
+        job_docs, errors = [], []
+        for job, skills in zip(chunk, all_skills):
+            if isinstance(skills, Exception):
+                errors.append({"job_id": str(job["_id"]), "title": job["title"], "error": _error_detail(skills)})
+                continue
+            job_docs.append({
+                "_id": job["_id"],
+                "title": job["title"],
+                "description": job["description"],
+                "required_skills": skills,
+                "user_id": user_id,
+                "username": task["payload"]["username"],
+            })
+        await run_in_threadpool(_store_jobs, user_id, job_docs)
+        await run_in_threadpool(
+            update_progress, task["_id"],
+            completed=len(job_docs), failed=len(errors), errors=errors, checkpoint=start + len(chunk)
+        )
+
+# ---- bulk re-extraction ----
+
+def _resume_filters(only_missing: bool) -> dict:
+    # Duplicate links (see dedup) are matched through their original
+    filters = {"duplicate_of": {"$exists": False}}
+    if only_missing:
+        filters["skills"] = {"$exists": False}
+    return filters
+
+def _resume_chunk(user_id: str, only_missing: bool, after=None) -> list:
+    """The next chunk of resumes to re-extract, with their text."""
+    resumes = list(repositories.find_user_resumes(
+        user_id, {"user_id": 1, "filename": 1, "resume_text": 1},
+        after=after, limit=BULK_CHUNK_SIZE, filters=_resume_filters(only_missing)
+    ))
+    return resume_blobs.attach_texts(resumes)
+
+async def estimate_reextraction(user_id: str, only_missing: bool = False) -> dict:
+    """Dry run of reextract_resume_skills_task, planning the same per-chunk batches."""
+    counts, request_tokens, after = {}, [], None
+    while True:
+        resumes = await run_in_threadpool(_resume_chunk, user_id, only_missing, after)
+        if not resumes:
+            return _estimate(counts, request_tokens, BULK_CONCURRENCY)
+        after = resumes[-1]["_id"]
+        texts = [resume.get("resume_text") or "" for resume in resumes]
+        _, pending = await resolve_without_llm(texts, counts=counts)
+        request_tokens.extend(batch_request_tokens([texts[i] for i in pending]))
+
+def enqueue_reextraction(user_id: str, only_missing: bool = False) -> tuple:
+    """
+    Queue skill re-extraction for a user's resumes. Returns (task ID, resume
+    count); the task ID is None when one is already queued or running.
+    """
+    total = repositories.count_user_resumes(user_id, _resume_filters(only_missing))
+    task_id = enqueue_task(REEXTRACT_TASK, user_id, {"only_missing": only_missing}, total=total, exclusive=True)
+    return task_id, total
+
+def _store_resume_skills(resumes: list):
+    updates = []
+    for resume in resumes:
+        resume["skill_ids"] = skill_registry.skill_ids(resume["skills"])
+        updates.append((resume["_id"], {
+            "skills": resume["skills"], "skill_ids": resume["skill_ids"], **skill_embedding_fields(resume["skills"])
+        }))
+    repositories.update_resumes(updates)
+    with metrics.timed("skill_indexing"):
+        skill_index.index_resumes(resumes)
+
+@task_handler(REEXTRACT_TASK)
+async def reextract_resume_skills_task(task: dict):
+    """
+    Background task: extract and store the skills of all of a user's resumes
+    again (or, with only_missing, of those that have none), in _id order. The
+    checkpoint is the _id of the last resume done. Extraction goes through the
+    skill cache, whose keys include the model and prompt version, so after a
+    prompt or model change every resume is sent to OpenAI again, while a rerun
+    without one only re-canonicalizes and reindexes the stored skills.
+    """
+    user_id = task["user_id"]
+    only_missing = task["payload"].get("only_missing", False)
+    after = task.get("checkpoint")
+    while True:
+        resumes = await run_in_threadpool(_resume_chunk, user_id, only_missing, after)
+        if not resumes:
+            return
+        after = resumes[-1]["_id"]
+        with metrics.timed("skill_extraction"):
+            all_skills = await extract_skills_batched(
+                [resume.get("resume_text") or "" for resume in resumes], concurrency=BULK_CONCURRENCY
+            )
+        extracted, errors = [], []
+        for resume, skills in zip(resumes, all_skills):
+            if isinstance(skills, Exception):
+                errors.append({"resume_id": str(resume["_id"]), "error": _error_detail(skills)})
+                continue
+            resume.pop("resume_text", None)
+            resume["skills"] = skills
+            extracted.append(resume)
+        await run_in_threadpool(_store_resume_skills, extracted)
+        await run_in_threadpool(
+            update_progress, task["_id"],
+            completed=len(extracted), failed=len(errors), errors=errors, checkpoint=after
+        )
@@ -1,9 +1,72 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import OperationFailure
 import os
 from dotenv import load_dotenv
+from metrics import MongoCommandMetrics
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["resume_screener_db"]  # or any preferred DB name
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "resume_screener_db")
+# Use pymongo's native asyncio client for the async routes instead of the threadpool.
+MONGO_ASYNC = os.getenv("MONGO_ASYNC", "false").lower() == "true"
+
+def _client_options() -> dict:
+    """Connection pool and timeout settings, overridable through the environment."""
+    options = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+        # Nothing connects at import; the app's startup warms the pool (see main.warm_up)
+        "connect": False,
+        # Per-command latency histograms on /metrics
+        "event_listeners": [MongoCommandMetrics()],
+    }
+    socket_timeout = os.getenv("MONGO_SOCKET_TIMEOUT_MS")
+    if socket_timeout:
+        options["socketTimeoutMS"] = int(socket_timeout)
+    return options
+
+# The client connects lazily, on the first operation, so importing this module
+# (e.g. in a process manager before it starts workers) opens no sockets.
+client = MongoClient(MONGO_URI, **_client_options())
+db = client[MONGO_DB_NAME]
+
+_async_client = None
+
+def get_async_db():
+    """Database handle on the asyncio driver (created on first use)."""
+    global _async_client
+    if _async_client is None:
+        from pymongo import AsyncMongoClient
+        _async_client = AsyncMongoClient(MONGO_URI, **_client_options())
+    return _async_client[MONGO_DB_NAME]
+
+# Indexes on the core collections; feature modules declare their own ensure_indexes().
+INDEXES = {
+    "users": [([("username", ASCENDING)], {"unique": True})],
+    "resumes": [([("user_id", ASCENDING), ("_id", ASCENDING)], {})],
+    "jobs": [([("user_id", ASCENDING), ("_id", ASCENDING)], {})],
+}
+
+def ensure_indexes():
+    """Create the core indexes. Idempotent, so it is safe to run on every startup."""
+    for collection, indexes in INDEXES.items():
+        for keys, options in indexes:
+            try:
+                db[collection].create_index(keys, **options)
+            except OperationFailure as e:
+                # e.g. existing duplicate usernames prevent the unique index
+                print(f"Could not create index {keys} on {collection}: {e}")
+
+def ping():
+    """Round trip to the server; used to warm up the connection pool."""
+    db.command("ping")
+
+async def close():
+    client.close()
+    if _async_client is not None:
+        await _async_client.close()
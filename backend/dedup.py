@@ -0,0 +1,153 @@
+# backend/dedup.py
+
+import hashlib
+import os
+import numpy as np
+from bson import Binary
+from db import db
+from skill_cache import normalize_text
+import resume_blobs
+
+# Ingest-time duplicate detection, scoped to one user's resumes:
+# - exact: the same PDF bytes (checked before parsing) or the same normalized text;
+# - near: estimated Jaccard similarity of word shingles >= NEAR_DUPLICATE_JACCARD,
+#   from MinHash signatures. Signatures are split into MINHASH_BANDS bands stored
+#   as an indexed array (LSH), so candidates come from one index lookup and are
+#   verified against the full signature. With the defaults a pair at Jaccard 0.8
+#   becomes a candidate ~95% of the time, a pair at 0.5 ~6%.
+#
+# What happens to a duplicate upload is the caller's choice (DUPLICATE_POLICIES):
+#   allow   - store it like any other resume
+#   skip    - don't store it; report the existing resume
+#   link    - store an exact copy as a lightweight link to the original
+#             ("duplicate_of"): no text, no LLM call, skills copied, not indexed
+#             for matching. A near-duplicate has text and skills of its own, so
+#             it is stored like any other resume (and reported).
+#   replace - overwrite the existing resume with the new upload
+# Exact copies within one upload batch are always skipped (reported with
+# "duplicate_of_file"), whatever the policy, except with allow.
+
+DUPLICATE_POLICIES = ("allow", "skip", "link", "replace")
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "allow")
+NEAR_DUPLICATE_JACCARD = float(os.getenv("NEAR_DUPLICATE_JACCARD", "0.8"))
+# Very short texts have too few shingles for a meaningful near-duplicate test.
+NEAR_DUPLICATE_MIN_WORDS = int(os.getenv("NEAR_DUPLICATE_MIN_WORDS", "30"))
+SHINGLE_WORDS = 3
+# Changing these (or the seed) invalidates the signatures already stored.
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 16
+_ROWS = MINHASH_PERMUTATIONS // MINHASH_BANDS
+_seeds = np.random.default_rng(20240601)
+# Multiply-shift hashing: (a * x + b) >> 32 over 64-bit words, with odd a
+_A = _seeds.integers(1, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _seeds.integers(0, 2**63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+# Fields returned for a matched existing resume
+DUPLICATE_PROJECTION = {"filename": 1, "skills": 1, "skill_ids": 1, "user_id": 1}
+
+def ensure_indexes():
+    for field in ("content_sha256", "text_sha256", "minhash_bands"):
+        db.resumes.create_index([("user_id", 1), (field, 1)])
+    db.resumes.create_index("duplicate_of", sparse=True)
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature (uint32[MINHASH_PERMUTATIONS]) of the distinct word shingles of the normalized text."""
+    words = normalize_text(text).split()
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+    return ((hashes[:, None] * _A[None, :] + _B[None, :]) >> np.uint64(32)).min(axis=0).astype(np.uint32)
+
+def _bands(signature: np.ndarray) -> list:
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * _ROWS:(band + 1) * _ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(MINHASH_BANDS)
+    ]
+
+def fingerprint_fields(text: str, content_sha256: str = None) -> dict:
+    """Fields stored on a resume so later uploads can be matched against it."""
+    fields = {"text_sha256": sha256_hex(normalize_text(text).encode("utf-8"))}
+    if content_sha256:
+        fields["content_sha256"] = content_sha256
+    if len(text.split()) >= NEAR_DUPLICATE_MIN_WORDS:
+        signature = minhash(text)
+        fields["minhash"] = Binary(signature.tobytes())
+        fields["minhash_bands"] = _bands(signature)
+    return fields
+
+def _originals(user_id: str, condition: dict) -> dict:
+    # Links are never matched themselves; their original is
+    return {"user_id": user_id, "duplicate_of": {"$exists": False}, **condition}
+
+def find_by_content_hash(user_id: str, content_sha256: str):
+    """The user's resume stored from byte-identical PDF, or None."""
+    return db.resumes.find_one(_originals(user_id, {"content_sha256": content_sha256}), DUPLICATE_PROJECTION)
+
+def find_duplicate(user_id: str, fields: dict):
+    """
+    Match fingerprint_fields() of a new upload against the user's resumes.
+    Returns (existing resume, "exact" | "near") or (None, None).
+    """
+    existing = db.resumes.find_one(_originals(user_id, {"text_sha256": fields["text_sha256"]}), DUPLICATE_PROJECTION)
+    if existing is not None:
+        return existing, "exact"
+    if "minhash" not in fields:
+        return None, None
+
+    signature = np.frombuffer(fields["minhash"], dtype=np.uint32)
+    best, best_similarity = None, NEAR_DUPLICATE_JACCARD
+    for candidate in db.resumes.find(
+        _originals(user_id, {"minhash_bands": {"$in": fields["minhash_bands"]}}),
+        {**DUPLICATE_PROJECTION, "minhash": 1}
+    ):
+        similarity = float(np.mean(np.frombuffer(candidate.pop("minhash"), dtype=np.uint32) == signature))
+        if similarity >= best_similarity:
+            best, best_similarity = candidate, similarity
+    if best is None:
+        return None, None
+    return best, "near"
+
+def link_document(original: dict, resume_doc: dict) -> dict:
+    """
+    A copy of resume_doc that points at the original instead of storing text and
+    extracting skills. Only for exact copies: the link shares the original's text.
+    """
+    link = {key: value for key, value in resume_doc.items() if key != "resume_text"}
+    link["duplicate_of"] = original["_id"]
+    link["skills"] = original.get("skills", [])
+    if "skill_ids" in original:
+        link["skill_ids"] = original["skill_ids"]
+    return link
+
+def promote_link(resume: dict):
+    """
+    Before an original resume is deleted, turn its oldest link into the new
+    original (taking over its text and skills) and repoint the other links.
+    The returned resume carries its text (for reindexing).
+    Returns the promoted resume, or None if there were no links.
+    """
+    link = db.resumes.find_one({"duplicate_of": resume["_id"]}, sort=[("_id", 1)])
+    if link is None:
+        return None
+    fields = {
+        key: resume[key]
+        for key in (
+            "resume_text", "text_sha256", "minhash", "minhash_bands",
+            "skills", "skill_ids", "skill_embedding", "embedding_model"
+        )
+        if key in resume
+    }
+    db.resumes.update_one({"_id": link["_id"]}, {"$set": fields, "$unset": {"duplicate_of": ""}})
+    db.resumes.update_many({"duplicate_of": resume["_id"]}, {"$set": {"duplicate_of": link["_id"]}})
+    text = resume_blobs.move(resume["_id"], link["_id"])
+    link.update(fields)
+    link.pop("duplicate_of")
+    if text is not None:
+        link["resume_text"] = text
+    return link
@@ -0,0 +1,98 @@
+# backend/embeddings.py
+
+import hashlib
+import os
+import re
+import numpy as np
+from bson import Binary
+from ttl_cache import TTLCache
+
+# "hashing" is deterministic and dependency-free (good for tests and small deployments);
+# "sentence-transformers" loads a local model if that optional package is installed.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+HASHING_EMBEDDING_DIM = int(os.getenv("HASHING_EMBEDDING_DIM", "512"))
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedder over words and character trigrams, so spelling
+    variants such as "postgres"/"postgresql" or "react"/"react.js" land close together.
+    """
+
+    def __init__(self, dim: int = HASHING_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> list:
+        features = []
+        for token in _TOKEN.findall(text.lower()):
+            features.append("w:" + token)
+            padded = f"<{token}>"
+            features.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        return normalize(vectors)
+
+class SentenceTransformerEmbedder:
+    """Local transformer model via the optional sentence-transformers package."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = self.model.encode(list(texts), convert_to_numpy=True)
+        return normalize(vectors.astype(np.float32))
+
+_embedder = None
+_skill_vectors = TTLCache(maxsize=50000, ttl=24 * 3600)
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND == "sentence-transformers":
+            _embedder = SentenceTransformerEmbedder()
+        else:
+            _embedder = HashingEmbedder()
+    return _embedder
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def embed_skills(skills: list) -> np.ndarray:
+    """Embed skill names (one row each), reusing vectors of skills seen before."""
+    embedder = get_embedder()
+    missing = [skill for skill in dict.fromkeys(skills) if _skill_vectors.get(skill) is None]
+    if missing:
+        for skill, vector in zip(missing, embedder.embed(missing)):
+            _skill_vectors.set(skill, vector)
+    if not skills:
+        return np.zeros((0, embedder.dim), dtype=np.float32)
+    return np.stack([_skill_vectors.get(skill) for skill in skills])
+
+def profile_vector(skills: list) -> np.ndarray:
+    """A single unit vector describing a set of skills (normalized mean of their embeddings)."""
+    if not skills:
+        return np.zeros(get_embedder().dim, dtype=np.float32)
+    return normalize(embed_skills(list(skills)).mean(axis=0))
+
+def skill_embedding_fields(skills: list) -> dict:
+    """Fields stored on a resume at ingest: its profile vector as compact float32 bytes."""
+    return {
+        "skill_embedding": Binary(profile_vector(skills).astype(np.float32).tobytes()),
+        "embedding_model": get_embedder().name,
+    }
+
+def from_binary(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
@@ -2,56 +2,124 @@
 
 import os
 import json
-import openai
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+import skill_cache
+import llm_client
+from skill_registry import canonicalize, split_skills
+from local_extractor import extract_skills_locally
 
-def extract_skills_from_text(resume_text: str) -> list:
+SKILL_MODEL = "gpt-3.5-turbo"
+
+# "llm" (default) asks OpenAI; "local" only uses the offline taxonomy matcher (no
+# network); "hybrid" uses the local matcher and only asks the LLM when it finds
+# fewer than HYBRID_MIN_SKILLS skills, merging both results.
+SKILL_EXTRACTOR = os.getenv("SKILL_EXTRACTOR", "llm").lower()
+HYBRID_MIN_SKILLS = int(os.getenv("HYBRID_MIN_SKILLS", "5"))
+
+# Bump a prompt's version whenever its wording changes so cached skills are not reused.
+RESUME_PROMPT_VERSION = "resume-v1"
+RESUME_PROMPT = (
+    "You are an AI assistant that extracts professional skills "
+    "from the following text. "
+    "Return ONLY a strict JSON array of strings with NO code fences, "
+    "e.g. [\"python\", \"sql\", \"react\"]."
+)
+
+JOB_PROMPT_VERSION = "job-v1"
+JOB_PROMPT = (
+    "You are an AI assistant that extracts professional skills "
+    "from job descriptions. "
+    "Return ONLY a strict JSON array of strings with NO code fences, "
+    "e.g. [\"Python\", \"SQL\", \"React\"]."
+)
+
+def parse_skills_output(raw_output: str) -> list:
     """
-    Reusable helper function that:
-    1) Calls OpenAI ChatCompletion to parse skills from resume_text.
-    2) Returns a list of all-lowercase strings.
-    If no text is provided, returns an empty list.
+    Turn the model's reply into a list of canonical skill names (see skill_registry).
+    If it isn't a JSON array, the reply is split on commas, semicolons and newlines.
+    """
+    try:
+        parsed = json.loads(raw_output)
+    except json.JSONDecodeError:
+        parsed = None
+    if not isinstance(parsed, list):
+        parsed = split_skills(raw_output)
+    return canonicalize(parsed)
+
+def local_skills_if_sufficient(text: str):
+    """
+    Skills from the local extractor when, in the configured mode, no LLM call is
+    needed for this text; None when the LLM should be asked.
+    """
+    if SKILL_EXTRACTOR == "llm":
+        return None
+    skills = extract_skills_locally(text)
+    if SKILL_EXTRACTOR == "local" or len(skills) >= HYBRID_MIN_SKILLS:
+        return skills
+    return None
+
+def merge_skills(*skill_lists) -> list:
+    """Concatenate skill lists, dropping duplicates but keeping order."""
+    return list(dict.fromkeys(skill for skills in skill_lists for skill in skills))
+
+async def chat_completion(system_prompt: str, user_content: str) -> str:
+    """
+    Send one chat completion request through the shared LLM client and return the
+    stripped reply text. Errors are raised as HTTPException with the client's
+    status (502 upstream error, 503 throttled or circuit open, 504 timeout).
     """
-    if not resume_text.strip():
+    try:
+        return await llm_client.chat(system_prompt, user_content, SKILL_MODEL)
+    except llm_client.LLMError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"OpenAI error: {e}")
+
+async def request_skills(text: str, system_prompt: str, prompt_version: str) -> list:
+    """
+    Ask the LLM for a text's skills and store them in the skill cache, without
+    looking the cache up first (for callers that already missed it).
+    """
+    skills = parse_skills_output(await chat_completion(system_prompt, text))
+    key = skill_cache.cache_key(text, SKILL_MODEL, prompt_version)
+    await run_in_threadpool(skill_cache.store_skills, key, skills, SKILL_MODEL, prompt_version)
+    return skills
+
+async def _extract_skills(text: str, system_prompt: str, prompt_version: str) -> list:
+    """
+    Shared implementation for resumes and job descriptions.
+    Depending on SKILL_EXTRACTOR the local matcher may answer on its own.
+    Identical (normalized) text is served from the skill cache without calling OpenAI.
+    """
+    if not text.strip():
         # If there's no text, just return empty
         return []
 
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    local_skills = local_skills_if_sufficient(text)
+    if local_skills is not None:
+        return local_skills
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an AI assistant that extracts professional skills "
-                        "from the following text. "
-                        "Return ONLY a strict JSON array of strings with NO code fences, "
-                        "e.g. [\"python\", \"sql\", \"react\"]."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": resume_text
-                }
-            ],
-            temperature=0.0
-        )
-        raw_output = response.choices[0].message.content.strip()
-
-        # Attempt to parse JSON
-        try:
-            parsed = json.loads(raw_output)
-            if not isinstance(parsed, list):
-                return [raw_output.lower()]
-            return [skill.lower() for skill in parsed]
-        except json.JSONDecodeError:
-            # If parse fails, fallback to single string
-            return [raw_output.lower()]
-
-    except Exception as e:
-        # Re-raise or log as needed
-        raise HTTPException(status_code=500, detail=f"OpenAI error: {e}")
\ No newline at end of file
+    key = skill_cache.cache_key(text, SKILL_MODEL, prompt_version)
+    skills = await run_in_threadpool(skill_cache.get_cached_skills, key)
+    if skills is None:
+        skills = await request_skills(text, system_prompt, prompt_version)
+
+    if SKILL_EXTRACTOR == "hybrid":
+        skills = merge_skills(extract_skills_locally(text), skills)
+    # Entries cached before canonicalization existed are normalized here too
+    return canonicalize(skills)
+
+async def extract_skills_from_text(resume_text: str) -> list:
+    """
+    Reusable helper function that:
+    1) Asks OpenAI (through llm_client) to parse skills from resume_text.
+    2) Returns a list of canonical (lowercase) skill names.
+    If no text is provided, returns an empty list.
+    """
+    return await _extract_skills(resume_text, RESUME_PROMPT, RESUME_PROMPT_VERSION)
+
+async def extract_job_skills_from_text(description: str) -> list:
+    """
+    Same as extract_skills_from_text, but with the job description prompt.
+    Returns a list of canonical (lowercase) skill names.
+    """
+    return await _extract_skills(description, JOB_PROMPT, JOB_PROMPT_VERSION)
@@ -1,126 +1,218 @@
 # backend/job_router.py
 
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from db import db
-from user_router import get_current_user
-import openai
 import os
 import json
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import List, Optional
+import repositories
+from user_router import get_current_user
+from extract_skills import extract_job_skills_from_text
+import match_results
+from skill_matrix import get_user_matrix
+import semantic_match
+import skill_registry
+import bulk_operations
+import metrics
 
 job_router = APIRouter()
 
+# Upper bound on a /create-jobs request body (the jobs are stored in the task document)
+MAX_BULK_JOBS_BYTES = int(os.getenv("MAX_BULK_JOBS_BYTES", str(8 * 1024 * 1024)))
+
 class JobCreate(BaseModel):
     title: str
     description: str
 
 @job_router.post("/create-job")
-def create_job(job: JobCreate, current_user: dict = Depends(get_current_user)):
+async def create_job(job: JobCreate, current_user: dict = Depends(get_current_user)):
     """
     Create a new job listing, link it to the current user,
     and auto-extract required skills from the description.
-    Ensures 'required_skills' is a list of strings (all lowercase).
+    Ensures 'required_skills' is a list of canonical skill names, with their
+    registry IDs in 'required_skill_ids'. The job's match results are
+    materialized right away.
     """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    # 1. Extract skills from job description (served from the skill cache when possible)
+    with metrics.timed("job_skill_extraction"):
+        required_skills = await extract_job_skills_from_text(job.description)
+    required_skill_ids = await run_in_threadpool(skill_registry.skill_ids, required_skills)
 
-    # 1. Extract skills from job description
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an AI assistant that extracts professional skills "
-                        "from job descriptions. "
-                        "Return ONLY a strict JSON array of strings with NO code fences, "
-                        "e.g. [\"Python\", \"SQL\", \"React\"]."
-                    )
-                },
-                {
-                    "role": "user",
-                    "content": job.description
-                }
-            ],
-            temperature=0.0
-        )
-        raw_output = response.choices[0].message.content.strip()
-
-        try:
-            parsed_skills = json.loads(raw_output)
-            if isinstance(parsed_skills, list):
-                # Convert each skill to lowercase
-                required_skills = [skill.lower() for skill in parsed_skills]
-            else:
-                required_skills = [raw_output.lower()]
-        except json.JSONDecodeError:
-            required_skills = [raw_output.lower()]
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OpenAI error: {e}")
-
-    # 2. Store the job
+    # 2. Store the job and score it against the user's resumes
     job_doc = {
         "title": job.title,
         "description": job.description,
         "required_skills": required_skills,
+        "required_skill_ids": required_skill_ids,
         "user_id": str(current_user["_id"]),
         "username": current_user["username"]
     }
-    result = db.jobs.insert_one(job_doc)
+    job_id = await run_in_threadpool(repositories.insert_job, job_doc)
+    await run_in_threadpool(match_results.build_job, job_id, job_doc["user_id"], set(required_skill_ids))
 
     return {
         "message": "Job created and skills extracted successfully",
-        "job_id": str(result.inserted_id),
+        "job_id": str(job_id),
         "required_skills": required_skills
     }
 
+async def _read_jobs(request: Request) -> list:
+    """Jobs from a JSON body ([...] or {"jobs": [...]}), a text/csv body or a multipart 'file' CSV upload."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV file in the 'file' field")
+        content = await upload.read(MAX_BULK_JOBS_BYTES + 1)
+        is_csv = True
+    else:
+        content = bytearray()
+        async for part in request.stream():
+            content += part
+            if len(content) > MAX_BULK_JOBS_BYTES:
+                break
+        is_csv = content_type.startswith(("text/csv", "application/csv"))
+    if len(content) > MAX_BULK_JOBS_BYTES:
+        raise HTTPException(status_code=413, detail=f"Payload exceeds {MAX_BULK_JOBS_BYTES} bytes")
+
+    try:
+        if is_csv:
+            return bulk_operations.parse_jobs_csv(content)
+        try:
+            data = json.loads(content)
+        except ValueError:
+            raise ValueError("Expected a JSON or CSV body")
+        return bulk_operations.validate_jobs(data.get("jobs") if isinstance(data, dict) else data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@job_router.post("/create-jobs")
+async def create_jobs(
+    request: Request,
+    dry_run: bool = Query(False),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create many job listings at once from JSON ([{"title", "description"}, ...]
+    or {"jobs": [...]}) or CSV with 'title' and 'description' columns (as a
+    text/csv body or a multipart 'file' upload). The jobs are created by a queued
+    task, like /create-job but with bounded concurrency and bulk writes; poll
+    /tasks/{task_id} for progress. Their IDs are returned right away.
+    With dry_run=true nothing is created and the OpenAI requests, tokens, cost
+    and time the task would take are estimated instead.
+    """
+    jobs = await _read_jobs(request)
+    if dry_run:
+        return await bulk_operations.estimate_job_creation(jobs)
+    task_id, job_ids = await run_in_threadpool(bulk_operations.enqueue_job_creation, jobs, current_user)
+    return JSONResponse(
+        status_code=202,
+        content={"message": f"Creation of {len(job_ids)} jobs queued", "task_id": task_id, "job_ids": job_ids}
+    )
+
 @job_router.post("/match/{job_id}")
 def match_resumes(
     job_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    engine: str = Query("index", pattern="^(index|matrix|semantic)$"),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    For a given job, compare its required skills to all
-    resumes belonging to the current user. Return a ranked list.
+    For a given job, rank the current user's resumes by skill overlap.
+    engine=index serves one page (`offset`, `limit`) of the materialized match
+    results, which are kept up to date as resumes change; engine=matrix scores
+    all resumes at once on the user's bit-packed skill matrix. Either way only
+    resumes sharing at least one skill are returned, best first. Every engine
+    pages with `offset` and `limit`.
+    engine=semantic also counts similar skills ("postgres" ~ "postgresql") using
+    skill embeddings and a nearest-neighbour index over resumes.
     """
-    job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    job = repositories.find_job(
+        job_id, {"title": 1, "required_skills": 1, "required_skill_ids": 1, "user_id": 1, "matches_materialized": 1}
+    )
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     if job.get("user_id") != str(current_user["_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to access this job")
 
-    job_skills = set(job.get("required_skills", []))
+    job_skill_ids = _job_skill_ids(job)
+    user_id = str(current_user["_id"])
+
+    with metrics.timed(f"match_{engine}"):
+        # matrix and semantic rank on the fly: take the top offset + limit and drop the earlier pages
+        if engine == "matrix":
+            matches = _with_skill_names(
+                get_user_matrix(user_id).top_matches([job_skill_ids], offset + limit)[0][offset:]
+            )
+        elif engine == "semantic":
+            matches = semantic_match.top_matches(user_id, set(job.get("required_skills", [])), offset + limit)[offset:]
+        else:
+            matches = _with_skill_names(match_results.top_matches(job, user_id, job_skill_ids, limit, offset))
 
-    user_resumes = list(db.resumes.find({"user_id": str(current_user["_id"])}))
-    ranked_results = []
-    for resume in user_resumes:
-        resume_skills = set(resume.get("skills", []))
-        
-        # Define a default intersection so it's always available.
-        intersection = set()
+    return {
+        "job_id": job_id,
+        "job_title": job["title"],
+        "matches": [_format_match(match) for match in matches]
+    }
 
-        if not resume_skills:
-            overlap_score = 0
-        else:
-            intersection = job_skills.intersection(resume_skills)
-            overlap_score = len(intersection) / len(job_skills) if job_skills else 0
+class MatchAllRequest(BaseModel):
+    job_ids: Optional[List[str]] = None  # defaults to all of the user's jobs
+
+@job_router.post("/match-all")
+def match_all_jobs(
+    request: Optional[MatchAllRequest] = None,
+    limit: int = Query(10, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Score many jobs against all of the current user's resumes in one vectorized
+    pass over the skill matrix. Returns the top `limit` resumes per job.
+    """
+    user_id = str(current_user["_id"])
+    jobs = repositories.find_user_jobs(
+        user_id,
+        request.job_ids if request else None,
+        {"title": 1, "required_skills": 1, "required_skill_ids": 1}
+    )
+
+    job_skill_sets = [_job_skill_ids(job) for job in jobs]
+    with metrics.timed("match_all"):
+        all_matches = [
+            _with_skill_names(matches)
+            for matches in get_user_matrix(user_id).top_matches(job_skill_sets, limit)
+        ]
+
+    return {
+        "results": [
+            {
+                "job_id": str(job["_id"]),
+                "job_title": job["title"],
+                "matches": [_format_match(match) for match in matches]
+            }
+            for job, matches in zip(jobs, all_matches)
+        ]
+    }
 
-        ranked_results.append({
-            "resume_id": str(resume["_id"]),
-            "filename": resume.get("filename"),
-            "overlap_score": overlap_score,
-            "matched_skills": list(intersection)
-        })
+def _job_skill_ids(job: dict) -> set:
+    ids = job.get("required_skill_ids")
+    if ids is None:
+        # Stored before the skill registry existed
+        ids = skill_registry.skill_ids(job.get("required_skills", []))
+    return set(ids)
 
-    ranked_results.sort(key=lambda x: x["overlap_score"], reverse=True)
+def _with_skill_names(matches: list) -> list:
+    """Replace matched skill IDs with their canonical names."""
+    return [{**match, "matched_skills": skill_registry.skill_names(match["matched_skills"])} for match in matches]
 
+def _format_match(match: dict) -> dict:
     return {
-        "job_id": job_id,
-        "job_title": job["title"],
-        "matches": ranked_results
-    }
\ No newline at end of file
+        "resume_id": str(match["resume_id"]),
+        "filename": match["filename"],
+        "overlap_score": match["overlap_score"],
+        "matched_skills": match["matched_skills"]
+    }
@@ -0,0 +1,306 @@
+# backend/llm_client.py
+
+import asyncio
+import os
+import random
+import re
+import time
+import httpx
+import metrics
+
+# The one way the backend talks to the OpenAI API. All chat completions share:
+# - a pooled HTTP/1.1 connection pool (keep-alive, no TLS handshake per call);
+# - token buckets for requests and tokens per minute, which also follow the
+#   x-ratelimit-* and Retry-After headers of each response, so callers queue
+#   locally instead of collecting 429s;
+# - bounded retries of timeouts, connection errors, 429 and 5xx with exponential
+#   backoff and full jitter, all within LLM_DEADLINE_SECONDS per call;
+# - a circuit breaker: after LLM_BREAKER_FAILURES consecutive failed attempts,
+#   calls fail fast for LLM_BREAKER_RESET_SECONDS, then one trial call decides
+#   whether to close it again.
+# Errors are raised as LLMError subclasses carrying the HTTP status the API
+# should answer with.
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+# The account's limits; 0 leaves pacing to the provider's rate-limit headers alone.
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# Completion tokens reserved per request before the usage is known
+COMPLETION_TOKEN_RESERVE = 256
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+class LLMError(Exception):
+    status_code = 502
+
+class LLMConfigError(LLMError):
+    status_code = 500
+
+class LLMTimeoutError(LLMError):
+    status_code = 504
+
+class LLMRateLimitError(LLMError):
+    status_code = 503
+
+class CircuitOpenError(LLMError):
+    status_code = 503
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def parse_duration(value) -> float:
+    """Seconds in a rate-limit header value such as "20ms", "1.5s", "6m0s" or "12"; None if unparsable."""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+class TokenBucket:
+    """
+    Refills at `per_minute` / 60 per second up to one minute's worth; waiters are
+    served in order. With per_minute=0 it only enforces pauses (see sync).
+    """
+
+    def __init__(self, per_minute: float):
+        self.limited = per_minute > 0
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if not self.limited:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if self.limited:
+                    wait = max(wait, (amount - self.tokens) / self.rate)
+                if wait <= 0:
+                    if self.limited:
+                        self.tokens -= amount
+                    return
+                await asyncio.sleep(wait)
+
+    def sync(self, remaining, reset_seconds):
+        """Adopt the provider's remaining budget when it is lower than ours."""
+        if remaining is None:
+            return
+        if self.limited:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+        if remaining <= 0 and reset_seconds:
+            self.pause(reset_seconds)
+
+    def pause(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        metrics.OPENAI_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            metrics.OPENAI_CIRCUIT_OPEN.set(1)
+        self.trial_in_flight = False
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def _header_int(headers, name: str):
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+class LLMClient:
+    def __init__(self, api_key: str, api_base: str):
+        self.http = httpx.AsyncClient(
+            base_url=api_base.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS
+            ),
+        )
+        self.requests = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(LLM_TOKENS_PER_MINUTE)
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+
+    def _follow_rate_limits(self, headers):
+        self.requests.sync(
+            _header_int(headers, "x-ratelimit-remaining-requests"),
+            parse_duration(headers.get("x-ratelimit-reset-requests"))
+        )
+        self.tokens.sync(
+            _header_int(headers, "x-ratelimit-remaining-tokens"),
+            parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        )
+
+    async def chat(self, messages: list, model: str, temperature: float = 0.0) -> dict:
+        """POST /chat/completions with rate limiting, retries and circuit breaking; returns the response JSON."""
+        deadline = time.monotonic() + LLM_DEADLINE_SECONDS
+        cost = sum(estimate_tokens(m["content"]) for m in messages) + COMPLETION_TOKEN_RESERVE
+        body = {"model": model, "messages": messages, "temperature": temperature}
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            if not self.breaker.allow():
+                metrics.OPENAI_REQUESTS.inc(1, "circuit_open")
+                raise CircuitOpenError("OpenAI is failing; requests are paused")
+            # Set only when this call was let through as the half-open trial
+            trial = self.breaker.trial_in_flight
+            try:
+                await self.requests.acquire()
+                await self.tokens.acquire(cost)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMTimeoutError(f"No response within {LLM_DEADLINE_SECONDS:.0f}s")
+
+                retry_after = None
+                try:
+                    with metrics.timed("openai"):
+                        response = await self.http.post(
+                            "/chat/completions", json=body, timeout=min(LLM_TIMEOUT_SECONDS, remaining)
+                        )
+                except httpx.TimeoutException:
+                    reason, error = "timeout", LLMTimeoutError(f"Timed out after {min(LLM_TIMEOUT_SECONDS, remaining):.0f}s")
+                    self.breaker.record_failure()
+                except httpx.TransportError as e:
+                    reason, error = "connection", LLMError(f"Connection error: {e!r}")
+                    self.breaker.record_failure()
+                else:
+                    self._follow_rate_limits(response.headers)
+                    if response.status_code == 200:
+                        self.breaker.record_success()
+                        try:
+                            result = response.json()
+                        except ValueError:
+                            result = None
+                        if not isinstance(result, dict):
+                            metrics.OPENAI_REQUESTS.inc(1, "error")
+                            raise LLMError(f"Malformed response: {response.text[:200]}")
+                        metrics.OPENAI_REQUESTS.inc(1, "ok")
+                        metrics.record_openai_usage(result.get("usage"))
+                        return result
+                    detail = response.text[:200]
+                    if response.status_code not in RETRYABLE_STATUS:
+                        # The request itself is wrong; the provider is fine
+                        self.breaker.record_success()
+                        metrics.OPENAI_REQUESTS.inc(1, "error")
+                        raise LLMError(f"HTTP {response.status_code}: {detail}")
+                    retry_after = parse_duration(response.headers.get("retry-after-ms"))
+                    retry_after = retry_after / 1000 if retry_after is not None else parse_duration(
+                        response.headers.get("retry-after")
+                    )
+                    if response.status_code == 429:
+                        # Throttling is handled by the buckets, not the breaker
+                        reason, error = "throttled", LLMRateLimitError(f"Rate limited: {detail}")
+                        self.requests.pause(retry_after or _backoff(attempt))
+                    else:
+                        reason, error = "server_error", LLMError(f"HTTP {response.status_code}: {detail}")
+                        self.breaker.record_failure()
+            finally:
+                # Release a trial that ended without a verdict (throttled, cancelled,
+                # any other error) so the next call can try again
+                if trial:
+                    self.breaker.trial_in_flight = False
+
+            metrics.OPENAI_REQUESTS.inc(1, reason)
+            delay = max(retry_after or 0.0, _backoff(attempt))
+            if attempt == LLM_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                raise error
+            metrics.OPENAI_RETRIES.inc(1, reason)
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        await self.http.aclose()
+
+# One client per event loop (in practice the server's); httpx pools and asyncio
+# locks cannot be shared across loops.
+_client = None
+_client_loop = None
+
+def get_client() -> LLMClient:
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise LLMConfigError("OpenAI API key not configured")
+        api_base = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+        _client, _client_loop = LLMClient(api_key, api_base), loop
+    return _client
+
+async def chat(system_prompt: str, user_content: str, model: str, temperature: float = 0.0) -> str:
+    """One chat completion with a system and a user message; returns the stripped reply text."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+    result = await get_client().chat(messages, model, temperature)
+    try:
+        return result["choices"][0]["message"]["content"].strip()
+    except (KeyError, IndexError, TypeError, AttributeError):
+        raise LLMError(f"Malformed response: no reply text in {str(result)[:200]}")
+
+async def close():
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.close()
+    _client = _client_loop = None
@@ -0,0 +1,91 @@
+# backend/local_extractor.py
+
+import re
+from skill_taxonomy import SKILL_TAXONOMY, AMBIGUOUS_NAMES
+
+_WHITESPACE = re.compile(r"\s+")
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton: finds every occurrence of many patterns in one
+    pass over the text, in time linear in the text length plus the matches.
+    """
+
+    def __init__(self, patterns: dict):
+        # patterns: pattern string -> value reported on a match
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # state -> [(pattern length, value)]
+
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append((len(pattern), value))
+
+        # Breadth-first pass to set failure links
+        queue = list(self.goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text: str):
+        """Yield (start, end, value) for every pattern occurrence in text."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.output[state]:
+                yield index - length + 1, index + 1, value
+
+class LocalSkillExtractor:
+    """
+    Offline skill extractor: matches the canonical names (except ambiguous ones)
+    and aliases of the skill taxonomy as whole words and reports canonical skill names.
+    """
+
+    def __init__(self, taxonomy: dict = SKILL_TAXONOMY, ambiguous: set = AMBIGUOUS_NAMES):
+        patterns = {}
+        for canonical, aliases in taxonomy.items():
+            # "go", "c", "r" are everyday words or letters; only their aliases count
+            names = aliases if canonical in ambiguous else [canonical, *aliases]
+            for name in names:
+                patterns[name.lower()] = canonical
+        self.automaton = AhoCorasick(patterns)
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    def extract(self, text: str) -> list:
+        """Canonical skills found in text, in order of first occurrence."""
+        text = _WHITESPACE.sub(" ", text.lower())
+        found = {}
+        for start, end, canonical in self.automaton.search(text):
+            if self._is_boundary(text, start - 1) and self._is_boundary(text, end):
+                found.setdefault(canonical, start)
+        return sorted(found, key=found.get)
+
+_extractor = None
+
+def extract_skills_locally(text: str) -> list:
+    global _extractor
+    if _extractor is None:
+        _extractor = LocalSkillExtractor()
+    return _extractor.extract(text)
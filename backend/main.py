@@ -1,20 +1,81 @@
 # backend/main.py
 
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
-from db import db
+import db
 from resume_router import resume_router
 from user_router import user_router
 from job_router import job_router
+from task_router import task_router
+from pdf_extraction import shutdown_pdf_executor, warm_up_pdf_executor
+import skill_cache
+import repositories
+import password_hashing
+import task_queue
+import skill_index
+import skill_registry
+import match_results
+import metrics
+import dedup
+import text_search
+import llm_client
+import extract_skills
+from local_extractor import extract_skills_locally
+from embeddings import get_embedder
 
 load_dotenv()  # Take environment variables from .env
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MONGO_URI = os.getenv("MONGO_URI")
+# serve.py creates the indexes once before starting its workers and sets this
+SKIP_INDEX_CHECKS = os.getenv("SKIP_INDEX_CHECKS", "false").lower() == "true"
+# How long shutdown waits for running background tasks before requeueing them
+DRAIN_TIMEOUT_SECONDS = float(os.getenv("DRAIN_TIMEOUT_SECONDS", "30"))
 
-app = FastAPI()
+def prepare_database():
+    """Create every collection's indexes and seed the skill registry (idempotent)."""
+    db.ensure_indexes()
+    skill_cache.ensure_indexes()
+    task_queue.ensure_indexes()
+    skill_index.ensure_indexes()
+    skill_registry.ensure_indexes()
+    skill_registry.seed()
+    match_results.ensure_indexes()
+    dedup.ensure_indexes()
+    text_search.ensure_indexes()
+
+def warm_up():
+    """Pay the one-off costs before the first request instead of during it."""
+    # Fork the PDF workers before the Mongo client starts its threads
+    warm_up_pdf_executor()
+    db.ping()
+    skill_registry.preload()
+    get_embedder()
+    if extract_skills.SKILL_EXTRACTOR != "llm":
+        # Builds the matcher's automaton
+        extract_skills_locally("")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not SKIP_INDEX_CHECKS:
+        await run_in_threadpool(prepare_database)
+    await run_in_threadpool(warm_up)
+    task_queue.start_workers()
+    yield
+    # The server has stopped accepting requests and finished the in-flight ones
+    await task_queue.stop_workers(DRAIN_TIMEOUT_SECONDS)
+    shutdown_pdf_executor()
+    password_hashing.shutdown()
+    await llm_client.close()
+    await db.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,9 +85,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Per-route latency and in-flight request metrics. With PROFILING_ENABLED, a
+    request sent with an "X-Profile: 1" header is also profiled; the response's
+    X-Profile-Id header names the profile to fetch from /profiles/{id}.
+    """
+    profiler = None
+    if metrics.PROFILING_ENABLED and request.headers.get("x-profile"):
+        profiler = metrics.SamplingProfiler()
+        profiler.start()
+
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        # The route template keeps label cardinality bounded (no IDs in paths)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.REQUEST_DURATION.observe(elapsed, request.method, route, str(status))
+        if profiler is not None:
+            profiler.stop()
+
+    if profiler is not None:
+        response.headers["X-Profile-Id"] = metrics.store_profile(
+            profiler, request.method, request.url.path, elapsed
+        )
+    return response
+
 app.include_router(resume_router, prefix="/resumes", tags=["resumes"])
 app.include_router(user_router, prefix="/users", tags=["users"])
 app.include_router(job_router, prefix="/jobs", tags=["jobs"])
+app.include_router(task_router, prefix="/tasks", tags=["tasks"])
 
 @app.get("/")
 def read_root():
@@ -35,5 +130,41 @@ def read_root():
 @app.get("/test-db")
 def test_db():
     # Attempt to insert or fetch something from the database
-    db.test_collection.insert_one({"status": "connected"})
+    db.db.test_collection.insert_one({"status": "connected"})
     return {"message": "Database connection is working!"}
+
+@app.get("/cache-stats")
+def cache_stats():
+    """Hit/miss counters for the in-process caches."""
+    return {"skill_cache": skill_cache.stats(), "user_cache": repositories.user_cache.stats()}
+
+def _cache_metrics():
+    skill, user = skill_cache.stats(), repositories.user_cache.stats()
+    caches = {
+        "skill": (skill["memory_hits"] + skill["mongo_hits"], skill["misses"]),
+        "user": (user["hits"], user["misses"]),
+    }
+    return [
+        ("cache_hits_total", "counter", "Cache hits.",
+         [({"cache": name}, hits) for name, (hits, _) in caches.items()]),
+        ("cache_misses_total", "counter", "Cache misses.",
+         [({"cache": name}, misses) for name, (_, misses) in caches.items()]),
+        ("cache_hit_ratio", "gauge", "Cache hits per lookup since startup.",
+         [({"cache": name}, hits / (hits + misses) if hits + misses else 0.0)
+          for name, (hits, misses) in caches.items()]),
+    ]
+
+metrics.add_collector(_cache_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition of request, stage, database, OpenAI and cache metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles/{profile_id}", include_in_schema=False)
+def get_profile(profile_id: str):
+    """A request profile in collapsed-stack format (see record_request_metrics)."""
+    profile = metrics.profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile)
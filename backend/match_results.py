@@ -0,0 +1,205 @@
+# backend/match_results.py
+
+import os
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, DeleteMany, UpdateOne
+from pymongo.errors import OperationFailure
+from db import db
+
+# Materialized match scores, one document per (job, resume) pair that shares a skill:
+#   {"job_id": ObjectId, "resume_id": ObjectId, "user_id": ..., "filename": "cv.pdf",
+#    "matched_skill_ids": [1, 7], "overlap_score": 0.5}
+# Rows are written when a job is created and kept current as resumes are indexed or
+# removed (see skill_index), so a job's ranking is read straight off the
+# (job_id, overlap_score, resume_id) index, one page at a time.
+# Jobs whose rows are complete carry "matches_materialized": True. A builder first
+# claims a job by setting it to False with a lease (so only one builder runs, and
+# resumes indexed from then on are scored against the job by update_resumes),
+# then reads the postings. Rows are upserted by their unique (job_id, resume_id)
+# pair, so concurrent writers never leave duplicates.
+
+# A claim not finished within this time is taken over by the next builder
+MATERIALIZE_LEASE_SECONDS = int(os.getenv("MATERIALIZE_LEASE_SECONDS", "300"))
+
+def ensure_indexes():
+    db.match_results.create_index(
+        [("job_id", ASCENDING), ("overlap_score", DESCENDING), ("resume_id", ASCENDING)]
+    )
+    try:
+        db.match_results.create_index([("job_id", ASCENDING), ("resume_id", ASCENDING)], unique=True)
+    except OperationFailure:
+        # Rows written before the index existed can hold duplicate pairs. They
+        # are derived data: drop them and let every job rebuild on its next view.
+        db.match_results.delete_many({})
+        db.jobs.update_many({}, {"$unset": {"matches_materialized": "", "materializing_until": "", "materializing_by": ""}})
+        db.match_results.create_index([("job_id", ASCENDING), ("resume_id", ASCENDING)], unique=True)
+    db.match_results.create_index("resume_id")
+    db.match_results.create_index("user_id")
+
+def _row(job_id, job_skill_ids: set, resume_id, filename, user_id: str, matched: list) -> dict:
+    return {
+        "job_id": job_id,
+        "resume_id": resume_id,
+        "user_id": user_id,
+        "filename": filename,
+        "matched_skill_ids": matched,
+        "overlap_score": len(matched) / len(job_skill_ids),
+    }
+
+def _upsert(row: dict) -> UpdateOne:
+    return UpdateOne({"job_id": row["job_id"], "resume_id": row["resume_id"]}, {"$set": row}, upsert=True)
+
+def _claim(job_ids: list, fields: dict = None):
+    """
+    Mark jobs as being materialized by this caller. Only jobs that are not
+    materialized, or whose builder's lease ran out, are claimed. Returns
+    (claim token, claimed job IDs).
+    """
+    token = ObjectId()
+    now = datetime.now(timezone.utc)
+    db.jobs.update_many(
+        {"_id": {"$in": job_ids}, "$or": [
+            {"matches_materialized": {"$exists": False}},
+            {"matches_materialized": False, "materializing_until": {"$lt": now}},
+        ]},
+        {"$set": {
+            "matches_materialized": False,
+            "materializing_until": now + timedelta(seconds=MATERIALIZE_LEASE_SECONDS),
+            "materializing_by": token,
+            **(fields or {}),
+        }}
+    )
+    claimed = [job["_id"] for job in db.jobs.find({"_id": {"$in": job_ids}, "materializing_by": token}, {"_id": 1})]
+    # Rows of an earlier, unfinished build. Cleared before the postings are read:
+    # a row update_resumes writes after this belongs to a resume whose postings
+    # are either read by the builder or scored by update_resumes itself.
+    if claimed:
+        db.match_results.delete_many({"job_id": {"$in": claimed}})
+    return token, claimed
+
+def _finish(token, job_ids: list, rows: list):
+    """Write the rows of claimed jobs and mark them materialized (unless the claim was lost)."""
+    if rows:
+        db.match_results.bulk_write([_upsert(row) for row in rows], ordered=False)
+    db.jobs.update_many(
+        {"_id": {"$in": job_ids}, "materializing_by": token},
+        {"$set": {"matches_materialized": True}, "$unset": {"materializing_until": "", "materializing_by": ""}}
+    )
+
+def build_job(job_id, user_id: str, job_skill_ids: set) -> int:
+    """
+    Compute every row of one job from the skill index postings and mark the
+    job as materialized. Returns the number of matching resumes (0 when
+    another builder is already materializing the job).
+    """
+    # The skill IDs are stored with the claim: update_resumes reads them, and
+    # jobs stored before the skill registry existed have none of their own
+    token, claimed = _claim([job_id], {"required_skill_ids": sorted(job_skill_ids)})
+    if not claimed:
+        return 0
+    rows = []
+    if job_skill_ids:
+        pipeline = [
+            {"$match": {"user_id": user_id, "skill_id": {"$in": list(job_skill_ids)}}},
+            {"$group": {
+                "_id": "$resume_id",
+                "filename": {"$first": "$filename"},
+                "matched_skill_ids": {"$addToSet": "$skill_id"},
+            }},
+        ]
+        rows = [
+            _row(job_id, job_skill_ids, doc["_id"], doc.get("filename"), user_id, sorted(doc["matched_skill_ids"]))
+            for doc in db.resume_skills.aggregate(pipeline)
+        ]
+    _finish(token, claimed, rows)
+    return len(rows)
+
+def build_jobs(user_id: str, jobs: list) -> int:
+    """
+    build_job for many jobs of one user, reading the postings of all their skills
+    once. `jobs` is [(job_id, job_skill_ids)]. Returns the number of rows written.
+    """
+    if not jobs:
+        return 0
+    token, claimed = _claim([job_id for job_id, _ in jobs])
+    claimed = set(claimed)
+    jobs = [(job_id, skill_ids) for job_id, skill_ids in jobs if job_id in claimed]
+    if not jobs:
+        return 0
+    all_skill_ids = set().union(*(skill_ids for _, skill_ids in jobs))
+    resumes = {}  # resume_id -> (filename, skill IDs)
+    if all_skill_ids:
+        for posting in db.resume_skills.find(
+            {"user_id": user_id, "skill_id": {"$in": list(all_skill_ids)}},
+            {"_id": 0, "resume_id": 1, "skill_id": 1, "filename": 1}
+        ):
+            resumes.setdefault(posting["resume_id"], (posting.get("filename"), set()))[1].add(posting["skill_id"])
+    rows = []
+    for job_id, job_skill_ids in jobs:
+        for resume_id, (filename, resume_skill_ids) in resumes.items():
+            matched = sorted(job_skill_ids & resume_skill_ids)
+            if matched:
+                rows.append(_row(job_id, job_skill_ids, resume_id, filename, user_id, matched))
+    _finish(token, [job_id for job_id, _ in jobs], rows)
+    return len(rows)
+
+def update_resumes(user_id: str, resumes: list):
+    """
+    Recompute the rows of freshly (re)indexed resumes of one user against all
+    of that user's materialized jobs, including jobs being materialized right
+    now. `resumes` is [(resume_id, filename, skill_ids)].
+    """
+    if not resumes:
+        return
+    jobs = [
+        (job["_id"], set(job.get("required_skill_ids") or []))
+        for job in db.jobs.find(
+            {"user_id": user_id, "matches_materialized": {"$exists": True}},
+            {"required_skill_ids": 1}
+        )
+    ]
+    operations = []
+    for resume_id, filename, skill_ids in resumes:
+        resume_skill_ids = set(skill_ids)
+        matched_job_ids = []
+        for job_id, job_skill_ids in jobs:
+            matched = sorted(job_skill_ids & resume_skill_ids)
+            if matched:
+                matched_job_ids.append(job_id)
+                operations.append(_upsert(_row(job_id, job_skill_ids, resume_id, filename, user_id, matched)))
+        # Rows of jobs the resume no longer matches
+        operations.append(DeleteMany({"resume_id": resume_id, "job_id": {"$nin": matched_job_ids}}))
+    db.match_results.bulk_write(operations, ordered=False)
+
+def remove_resume(resume_id):
+    db.match_results.delete_many({"resume_id": resume_id})
+
+def clear_user(user_id: str):
+    """Drop a user's rows; their jobs are rebuilt on the next view."""
+    db.match_results.delete_many({"user_id": user_id})
+    db.jobs.update_many(
+        {"user_id": user_id}, {"$unset": {"matches_materialized": "", "materializing_until": "", "materializing_by": ""}}
+    )
+
+def top_matches(job: dict, user_id: str, job_skill_ids: set, limit: int, offset: int = 0) -> list:
+    """
+    One page of a job's ranking: highest overlap first, ties by resume ID.
+    Jobs created before the view existed are materialized on their first view.
+    Each result is {"resume_id", "filename", "overlap_score", "matched_skills"} with skill IDs.
+    """
+    if not job.get("matches_materialized"):
+        build_job(job["_id"], user_id, job_skill_ids)
+    cursor = db.match_results.find(
+        {"job_id": job["_id"]},
+        {"_id": 0, "resume_id": 1, "filename": 1, "overlap_score": 1, "matched_skill_ids": 1}
+    ).sort([("overlap_score", DESCENDING), ("resume_id", ASCENDING)]).skip(offset).limit(limit)
+    return [
+        {
+            "resume_id": row["resume_id"],
+            "filename": row.get("filename"),
+            "overlap_score": row["overlap_score"],
+            "matched_skills": row["matched_skill_ids"],
+        }
+        for row in cursor
+    ]
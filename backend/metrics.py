@@ -0,0 +1,247 @@
+# backend/metrics.py
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as _StackCounter
+from contextlib import contextmanager
+from pymongo import monitoring
+import shared_cache
+
+# In-process metrics exposed in the Prometheus text format on /metrics. Values are
+# per process: with several workers, scrape each one (or aggregate in Prometheus).
+
+# Set to "true" to allow profiling individual requests with the X-Profile header.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.005"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in values.items()
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *label_values):
+        self.inc(-amount, *label_values)
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def mean(self, *label_values):
+        """Average observed value of a series, or None before the first observation."""
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[-2] / series[-1] if series else None
+
+    def render(self) -> list:
+        with self._lock:
+            all_series = {key: list(series) for key, series in self._series.items()}
+        lines = super().render()
+        for key, series in all_series.items():
+            bounds = [*self.buckets, "+Inf"]
+            counts = [*series[:len(self.buckets)], series[-1]]
+            for bound, count in zip(bounds, counts):
+                labels = _format_labels(self.labels, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+_registry = []
+_collectors = []
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds", "Time spent in a processing stage (PDF parsing, OpenAI, ...).", ("stage",)
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command.", ("command", "status")
+)
+OPENAI_REQUESTS = Counter(
+    "openai_requests_total", "OpenAI chat completion attempts by outcome (ok, error, timeout, throttled, ...).",
+    ("status",)
+)
+OPENAI_RETRIES = Counter("openai_retries_total", "OpenAI requests retried, by reason.", ("reason",))
+OPENAI_CIRCUIT_OPEN = Gauge("openai_circuit_open", "1 while the OpenAI circuit breaker is open.")
+OPENAI_TOKENS = Counter("openai_tokens_total", "OpenAI tokens used.", ("kind",))
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_DURATION.observe(seconds, stage)
+
+@contextmanager
+def timed(stage: str):
+    """Record the duration of the enclosed block as a stage, also when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+def record_openai_usage(usage):
+    """Count the prompt/completion tokens of an OpenAI response's `usage`."""
+    if not usage:
+        return
+    OPENAI_TOKENS.inc(usage.get("prompt_tokens", 0), "prompt")
+    OPENAI_TOKENS.inc(usage.get("completion_tokens", 0), "completion")
+
+def add_collector(collect):
+    """
+    Register a function called on every scrape that returns
+    [(name, type, help, [(labels dict, value), ...]), ...], e.g. cache statistics.
+    """
+    _collectors.append(collect)
+
+def render() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        for name, kind, documentation, samples in collect():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return "\n".join(lines) + "\n"
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo listener timing every database command (passed to the MongoClient)."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, event.command_name, "ok")
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, event.command_name, "error")
+
+# ---- sampling profiler ----
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_backend_files = {}  # co_filename -> whether it is backend code (other than this module)
+
+def _is_backend_file(filename: str) -> bool:
+    result = _backend_files.get(filename)
+    if result is None:
+        path = os.path.abspath(filename)
+        result = _backend_files[filename] = (
+            path.startswith(_BACKEND_DIR + os.sep) and path != os.path.abspath(__file__)
+        )
+    return result
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every PROFILE_SAMPLE_INTERVAL_SECONDS while
+    running, so work done on the threadpool and process-pool callbacks is seen
+    too. Only stacks that pass through backend code are kept, which drops idle
+    workers; concurrent requests still show up, so profile on a quiet instance.
+    The result is in the collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = _StackCounter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_backend = False
+                while frame is not None:
+                    code = frame.f_code
+                    if _is_backend_file(code.co_filename):
+                        in_backend = True
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if in_backend:
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+# Recent profiles, fetched with GET /profiles/{profile_id} (from any worker when shared)
+profiles = shared_cache.cache("profiles", 32, 3600)
+
+def store_profile(profiler: SamplingProfiler, method: str, path: str, seconds: float) -> str:
+    profile_id = uuid.uuid4().hex
+    header = (
+        f"# {method} {path} took {seconds * 1000:.1f} ms, {profiler.samples} samples "
+        f"every {profiler.interval * 1000:.1f} ms\n"
+    )
+    profiles.set(profile_id, header + profiler.collapsed())
+    return profile_id
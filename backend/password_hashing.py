@@ -0,0 +1,40 @@
+# backend/password_hashing.py
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+import metrics
+
+# bcrypt work factor for new hashes. Existing hashes with a different cost are
+# transparently re-hashed on the user's next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so this many hashes run truly in parallel. Further
+# requests wait for a slot instead of piling onto the shared threadpool.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(os.cpu_count() or 1)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS, deprecated="auto")
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_CONCURRENCY, thread_name_prefix="bcrypt")
+_semaphore = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+
+async def _run(stage: str, func, *args):
+    # The stage includes time spent waiting for a free hashing slot
+    with metrics.timed(stage):
+        async with _semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, func, *args)
+
+async def hash_password(password: str) -> str:
+    return await _run("password_hash", pwd_context.hash, password)
+
+async def verify_password(password: str, hashed: str):
+    """
+    Check a password against its stored hash.
+    Returns (valid, new_hash); new_hash is set when the stored hash should be
+    replaced because the hashing parameters changed.
+    """
+    return await _run("password_verify", pwd_context.verify_and_update, password, hashed)
+
+def shutdown():
+    _executor.shutdown(wait=True)
@@ -0,0 +1,160 @@
+# backend/pdf_extraction.py
+
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import UploadFile
+from PyPDF2 import PdfReader
+import metrics
+
+# PDF parsing is CPU bound, so it runs on a process pool instead of the event loop.
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(os.cpu_count() or 1)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "50"))
+# Uploads up to this size are kept in memory; larger ones are spooled to a temp
+# file that the worker processes memory-map instead of receiving a pickled copy.
+SPOOL_MEMORY_BYTES = int(os.getenv("PDF_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+# Pages per worker task; longer documents are split across processes.
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+READ_CHUNK_BYTES = 64 * 1024
+
+class PDFLimitError(ValueError):
+    """The upload exceeds MAX_UPLOAD_BYTES or MAX_PDF_PAGES."""
+
+_pdf_executor = None
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared process pool used for PDF parsing."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_PARSE_WORKERS)
+    return _pdf_executor
+
+def warm_up_pdf_executor():
+    """Start the PDF worker processes now instead of on the first upload."""
+    get_pdf_executor().submit(os.getpid).result()
+
+def shutdown_pdf_executor():
+    """Stop the PDF process pool (called on app shutdown)."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+def extract_page_range(source, start: int, end: int, max_pages: int):
+    """
+    Extract the text of pages [start, end) from a PDF given as bytes or a file path.
+    Runs inside a worker process, so it must stay a module-level function.
+    Returns (page_count, page_texts); page_texts is None when page_count > max_pages.
+    """
+    if isinstance(source, bytes):
+        return _extract(PdfReader(io.BytesIO(source)), start, end, max_pages)
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _extract(PdfReader(mapped), start, end, max_pages)
+
+def _extract(reader: PdfReader, start: int, end: int, max_pages: int):
+    page_count = len(reader.pages)
+    if page_count > max_pages:
+        return page_count, None
+    return page_count, [reader.pages[i].extract_text() or "" for i in range(start, min(end, page_count))]
+
+async def spool_upload(file: UploadFile):
+    """
+    Read an upload in chunks, aborting as soon as it exceeds MAX_UPLOAD_BYTES.
+    Returns (source, size, sha256): source is bytes for small files, or the path
+    of a temp file for large ones (the caller deletes it).
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise PDFLimitError(f"File is larger than {MAX_UPLOAD_BYTES} bytes")
+
+    chunks = []
+    spool = None
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = await file.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise PDFLimitError(f"File is larger than {MAX_UPLOAD_BYTES} bytes")
+            if spool is None and size > SPOOL_MEMORY_BYTES:
+                spool = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+                spool.writelines(chunks)
+                chunks = []
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                chunks.append(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is None:
+        return b"".join(chunks), size, digest.hexdigest()
+    spool.close()
+    return spool.name, size, digest.hexdigest()
+
+async def extract_upload(file: UploadFile, skip_parse=None) -> dict:
+    """
+    Spool an uploaded PDF and extract its text on the process pool.
+    The first task parses the first PAGES_PER_TASK pages and reports the page count;
+    remaining pages are split across further tasks and run in parallel.
+    Returns {"text", "pages", "bytes", "sha256", "timings"} with per-stage timings
+    in milliseconds. If the awaitable skip_parse(sha256) returns true (e.g. a
+    byte-identical file is already stored) the PDF isn't parsed and text is None.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_pdf_executor()
+    timings = {}
+
+    started = time.perf_counter()
+    source, size, sha256 = await spool_upload(file)
+    timings["read_ms"] = (time.perf_counter() - started) * 1000
+
+    if skip_parse is not None and await skip_parse(sha256):
+        if isinstance(source, str):
+            os.unlink(source)
+        return {"text": None, "pages": None, "bytes": size, "sha256": sha256, "timings": timings}
+
+    try:
+        stage = time.perf_counter()
+        page_count, first_pages = await loop.run_in_executor(
+            executor, extract_page_range, source, 0, PAGES_PER_TASK, MAX_PDF_PAGES
+        )
+        if first_pages is None:
+            raise PDFLimitError(f"PDF has {page_count} pages (limit {MAX_PDF_PAGES})")
+        timings["first_pages_ms"] = (time.perf_counter() - stage) * 1000
+
+        stage = time.perf_counter()
+        rest = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor, extract_page_range, source, start, start + PAGES_PER_TASK, MAX_PDF_PAGES
+            )
+            for start in range(PAGES_PER_TASK, page_count, PAGES_PER_TASK)
+        ))
+        timings["remaining_pages_ms"] = (time.perf_counter() - stage) * 1000
+    finally:
+        if isinstance(source, str):
+            os.unlink(source)
+
+    page_texts = first_pages + [text for _, texts in rest for text in texts]
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+    for name, ms in timings.items():
+        metrics.observe_stage(f"pdf_{name[:-len('_ms')]}", ms / 1000)
+    return {
+        "text": "".join(page_texts),
+        "pages": page_count,
+        "bytes": size,
+        "sha256": sha256,
+        "timings": timings,
+    }
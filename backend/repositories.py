@@ -0,0 +1,155 @@
+# backend/repositories.py
+
+import os
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from db import db, get_async_db, MONGO_ASYNC
+import shared_cache
+
+# Data-access functions used by the routers. Sync functions are for the sync
+# (threadpool) routes; the *_async variants are for async routes and use the
+# asyncio driver when MONGO_ASYNC is enabled, or the threadpool otherwise.
+
+def to_object_id(value):
+    """Convert a path/query ID to an ObjectId, or None if it is malformed."""
+    if isinstance(value, ObjectId):
+        return value
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+# ---- users ----
+
+# Authenticated users are cached briefly so get_current_user does not hit Mongo on
+# every request. Writes through this module invalidate the entry (in every worker
+# when the cache is shared, see shared_cache); the TTL bounds staleness for
+# changes made on other hosts.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+user_cache = shared_cache.cache("users", USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+def find_user(username: str, include_password: bool = False) -> dict:
+    projection = None if include_password else {"password": 0}
+    return db.users.find_one({"username": username}, projection)
+
+def find_user_cached(username: str) -> dict:
+    """Like find_user (without the password hash), served from the user cache when possible."""
+    user = user_cache.get(username)
+    if user is None:
+        user = find_user(username)
+        if user is None:
+            return None
+        user_cache.set(username, user)
+    # Callers get their own copy so they can't modify the cached document
+    return dict(user)
+
+def invalidate_user(username: str):
+    user_cache.delete(username)
+
+def create_user(user_doc: dict) -> bool:
+    """Insert a user. Returns False if the username is already taken."""
+    try:
+        db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        return False
+    finally:
+        invalidate_user(user_doc["username"])
+    return True
+
+def update_user(username: str, fields: dict):
+    db.users.update_one({"username": username}, {"$set": fields})
+    invalidate_user(username)
+
+# ---- resumes ----
+
+def find_resume(resume_id, projection: dict = None) -> dict:
+    object_id = to_object_id(resume_id)
+    if object_id is None:
+        return None
+    return db.resumes.find_one({"_id": object_id}, projection)
+
+def find_user_resumes(user_id: str, projection: dict = None, after=None, limit: int = 0, batch_size: int = 0,
+                      filters: dict = None):
+    """Cursor over a user's resumes (matching `filters`) in _id order, starting after the given _id."""
+    query = {"user_id": user_id, **(filters or {})}
+    if after is not None:
+        query["_id"] = {"$gt": after}
+    cursor = db.resumes.find(query, projection).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    if batch_size:
+        cursor = cursor.batch_size(batch_size)
+    return cursor
+
+def count_user_resumes(user_id: str, filters: dict = None) -> int:
+    return db.resumes.count_documents({"user_id": user_id, **(filters or {})})
+
+def delete_resume(resume_id):
+    db.resumes.delete_one({"_id": to_object_id(resume_id)})
+
+def _resume_update(fields: dict, unset: list = None) -> dict:
+    update = {"$set": fields}
+    if unset:
+        update["$unset"] = {field: "" for field in unset}
+    return update
+
+def update_resume(resume_id, fields: dict, unset: list = None):
+    db.resumes.update_one({"_id": to_object_id(resume_id)}, _resume_update(fields, unset))
+
+def update_resumes(updates: list):
+    """Set fields on many resumes in one unordered bulk write; `updates` is [(resume_id, fields)]."""
+    if updates:
+        db.resumes.bulk_write(
+            [UpdateOne({"_id": to_object_id(resume_id)}, {"$set": fields}) for resume_id, fields in updates],
+            ordered=False
+        )
+
+async def insert_resume_async(resume_doc: dict):
+    """Insert one resume and return its _id."""
+    if MONGO_ASYNC:
+        result = await get_async_db().resumes.insert_one(resume_doc)
+    else:
+        result = await run_in_threadpool(db.resumes.insert_one, resume_doc)
+    return result.inserted_id
+
+async def insert_resumes_async(resume_docs: list) -> list:
+    """Bulk insert resumes (unordered) and return their _ids."""
+    if MONGO_ASYNC:
+        result = await get_async_db().resumes.insert_many(resume_docs, ordered=False)
+    else:
+        result = await run_in_threadpool(db.resumes.insert_many, resume_docs, ordered=False)
+    return result.inserted_ids
+
+async def find_resume_async(resume_id, projection: dict = None) -> dict:
+    if MONGO_ASYNC:
+        return await get_async_db().resumes.find_one({"_id": to_object_id(resume_id)}, projection)
+    return await run_in_threadpool(find_resume, resume_id, projection)
+
+async def update_resume_async(resume_id, fields: dict, unset: list = None):
+    if MONGO_ASYNC:
+        await get_async_db().resumes.update_one({"_id": to_object_id(resume_id)}, _resume_update(fields, unset))
+    else:
+        await run_in_threadpool(update_resume, resume_id, fields, unset)
+
+# ---- jobs ----
+
+def insert_job(job_doc: dict):
+    return db.jobs.insert_one(job_doc).inserted_id
+
+def put_jobs(job_docs: list):
+    """Insert or replace jobs by their (pre-assigned) _id in one unordered bulk write."""
+    if job_docs:
+        db.jobs.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in job_docs], ordered=False)
+
+def find_job(job_id, projection: dict = None) -> dict:
+    object_id = to_object_id(job_id)
+    if object_id is None:
+        return None
+    return db.jobs.find_one({"_id": object_id}, projection)
+
+def find_user_jobs(user_id: str, job_ids: list = None, projection: dict = None) -> list:
+    query = {"user_id": user_id}
+    if job_ids is not None:
+        query["_id"] = {"$in": [oid for oid in map(to_object_id, job_ids) if oid is not None]}
+    return list(db.jobs.find(query, projection))
@@ -0,0 +1,170 @@
+# backend/resume_blobs.py
+
+import argparse
+import os
+import zlib
+import bson
+from bson import Binary
+from pymongo import ReplaceOne
+from pymongo.errors import OperationFailure
+from db import db
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+# Resume text lives in its own collection, compressed, one document per resume:
+#   {"_id": resume_id, "user_id": ..., "codec": "zstd" | "zlib", "size": raw bytes, "data": Binary}
+# so the resume documents read by listing, matching and deleting carry only
+# metadata and skills. Text is loaded only where it is used (skill extraction,
+# search snippets, /my-resumes?fields=resume_text).
+# Resumes stored before this existed keep their inline "resume_text" until
+# `python resume_blobs.py migrate` moves it; readers accept either.
+
+# zstd when the zstandard package is installed, zlib otherwise. Blobs record their
+# codec, so changing it only affects new writes.
+RESUME_BLOB_CODEC = os.getenv("RESUME_BLOB_CODEC", "zstd" if zstandard else "zlib")
+ZSTD_LEVEL = int(os.getenv("RESUME_BLOB_ZSTD_LEVEL", "9"))
+ZLIB_LEVEL = int(os.getenv("RESUME_BLOB_ZLIB_LEVEL", "6"))
+MIGRATION_BATCH_SIZE = 500
+
+if RESUME_BLOB_CODEC == "zstd" and zstandard is None:
+    raise RuntimeError("RESUME_BLOB_CODEC=zstd needs the zstandard package")
+
+def compress(text: str) -> tuple:
+    """(codec, compressed bytes) for a text."""
+    raw = text.encode("utf-8")
+    if RESUME_BLOB_CODEC == "zstd":
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+def decompress(blob: dict) -> str:
+    data = bytes(blob["data"])
+    if blob["codec"] == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Resume text is zstd-compressed; install the zstandard package")
+        raw = zstandard.ZstdDecompressor().decompress(data, max_output_size=blob["size"])
+    else:
+        raw = zlib.decompress(data)
+    return raw.decode("utf-8")
+
+def _blob(resume_id, user_id: str, text: str) -> dict:
+    codec, data = compress(text)
+    return {"_id": resume_id, "user_id": user_id, "codec": codec, "size": len(text.encode("utf-8")), "data": Binary(data)}
+
+def insert_many(resumes: list):
+    """Store the text of new resumes; each needs '_id', 'user_id' and 'resume_text'."""
+    if resumes:
+        db.resume_blobs.insert_many([_blob(r["_id"], r["user_id"], r["resume_text"]) for r in resumes], ordered=False)
+
+def put(resume: dict):
+    """Store or replace the text of one resume."""
+    db.resume_blobs.replace_one(
+        {"_id": resume["_id"]}, _blob(resume["_id"], resume["user_id"], resume["resume_text"]), upsert=True
+    )
+
+def get_texts(resume_ids: list) -> dict:
+    """{resume_id: text} for the given resumes, from blobs or, if not migrated yet, the resume itself."""
+    texts = {blob["_id"]: decompress(blob) for blob in db.resume_blobs.find({"_id": {"$in": list(resume_ids)}})}
+    missing = [resume_id for resume_id in resume_ids if resume_id not in texts]
+    if missing:
+        for resume in db.resumes.find({"_id": {"$in": missing}, "resume_text": {"$exists": True}}, {"resume_text": 1}):
+            texts[resume["_id"]] = resume["resume_text"]
+    return texts
+
+def get_text(resume_id):
+    return get_texts([resume_id]).get(resume_id)
+
+def attach_texts(resumes: list) -> list:
+    """Set 'resume_text' on resume documents that don't carry it inline."""
+    texts = get_texts([r["_id"] for r in resumes if "resume_text" not in r])
+    for resume in resumes:
+        if "resume_text" not in resume and resume["_id"] in texts:
+            resume["resume_text"] = texts[resume["_id"]]
+    return resumes
+
+def delete(resume_id):
+    db.resume_blobs.delete_one({"_id": resume_id})
+
+def move(from_id, to_id):
+    """Re-key a resume's text to another resume (see dedup.promote_link). Returns the text, or None."""
+    blob = db.resume_blobs.find_one({"_id": from_id})
+    if blob is None:
+        return None
+    blob["_id"] = to_id
+    db.resume_blobs.replace_one({"_id": to_id}, blob, upsert=True)
+    db.resume_blobs.delete_one({"_id": from_id})
+    return decompress(blob)
+
+# ---- migration ----
+
+def collection_size(collection) -> dict:
+    """Document count, total and average BSON size, and index size of a collection."""
+    try:
+        stats = db.command({"collStats": collection.name})
+        return {
+            "count": stats.get("count", 0),
+            "size": stats.get("size", 0),
+            "avg_obj_size": stats.get("avgObjSize", 0),
+            "storage_size": stats.get("storageSize", 0),
+            "index_size": stats.get("totalIndexSize", 0),
+        }
+    except (OperationFailure, NotImplementedError):
+        pass
+    # Servers (or test doubles) without collStats: add up the documents
+    count = size = 0
+    for doc in collection.find():
+        count += 1
+        size += len(bson.encode(doc))
+    return {"count": count, "size": size, "avg_obj_size": size // count if count else 0}
+
+def migrate(batch_size: int = MIGRATION_BATCH_SIZE) -> tuple:
+    """
+    Move inline resume_text into compressed blobs, batch by batch (blobs first,
+    then $unset), so it can be interrupted and rerun. Returns
+    (resumes migrated, raw text bytes, compressed bytes).
+    """
+    migrated = raw_bytes = compressed_bytes = 0
+    query = {"resume_text": {"$exists": True}}
+    while True:
+        # Walks forward on _id, so each batch continues where the last one ended
+        resumes = list(db.resumes.find(query, {"user_id": 1, "resume_text": 1}).sort("_id", 1).limit(batch_size))
+        if not resumes:
+            return migrated, raw_bytes, compressed_bytes
+        query["_id"] = {"$gt": resumes[-1]["_id"]}
+        blobs = [_blob(r["_id"], r["user_id"], r["resume_text"] or "") for r in resumes]
+        db.resume_blobs.bulk_write(
+            [ReplaceOne({"_id": blob["_id"]}, blob, upsert=True) for blob in blobs], ordered=False
+        )
+        db.resumes.update_many({"_id": {"$in": [r["_id"] for r in resumes]}}, {"$unset": {"resume_text": ""}})
+        migrated += len(resumes)
+        raw_bytes += sum(blob["size"] for blob in blobs)
+        compressed_bytes += sum(len(blob["data"]) for blob in blobs)
+
+def _print_sizes(label: str):
+    for collection in (db.resumes, db.resume_blobs):
+        stats = collection_size(collection)
+        details = ", ".join(f"{key} {value:,}" for key, value in stats.items())
+        print(f"{label:>7} {collection.name}: {details}")
+
+if __name__ == "__main__":
+    # Move existing resume text out of the resume documents and report the
+    # collection sizes before and after:
+    #   python resume_blobs.py migrate
+    #   python resume_blobs.py sizes
+    parser = argparse.ArgumentParser(description="Compressed resume text storage")
+    parser.add_argument("command", choices=["migrate", "sizes"])
+    parser.add_argument("--batch-size", type=int, default=MIGRATION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "sizes":
+        _print_sizes("now")
+    else:
+        _print_sizes("before")
+        migrated, raw_bytes, compressed_bytes = migrate(args.batch_size)
+        _print_sizes("after")
+        ratio = raw_bytes / compressed_bytes if compressed_bytes else 0
+        print(f"Moved the text of {migrated} resumes: {raw_bytes:,} bytes -> {compressed_bytes:,} "
+              f"bytes compressed ({RESUME_BLOB_CODEC}, {ratio:.1f}x)")
+        print("Run the 'compact' command on the resumes collection to return the freed space to the OS.")
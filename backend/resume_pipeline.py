@@ -0,0 +1,270 @@
+# backend/resume_pipeline.py
+
+import asyncio
+import os
+from typing import List
+from fastapi import UploadFile
+from bson import ObjectId
+from starlette.concurrency import run_in_threadpool
+import repositories
+from pdf_extraction import extract_upload, PDFLimitError
+from llm_batching import extract_skills_batched
+from task_queue import enqueue_task, task_handler, update_progress
+import skill_index
+import skill_registry
+import text_search
+import resume_blobs
+import dedup
+from embeddings import skill_embedding_fields
+import metrics
+
+# Upper bound on simultaneous OpenAI requests made by a single batch upload.
+SKILL_EXTRACTION_CONCURRENCY = int(os.getenv("SKILL_EXTRACTION_CONCURRENCY", "8"))
+
+def _failure(filename: str, error: Exception, stage: str) -> dict:
+    status_code = 413 if isinstance(error, PDFLimitError) else 500
+    detail = getattr(error, "detail", error)
+    return {"filename": filename, "error": f"Error {stage}: {detail}", "status_code": status_code}
+
+async def process_resume_batch(
+    files: List[UploadFile],
+    current_user: dict,
+    extract: bool = True,
+    duplicates: str = dedup.DUPLICATE_POLICY
+):
+    """
+    Batch pipeline behind /resumes/upload-multiple and /resumes/upload-resume:
+    1) Parse every PDF in parallel on the process pool (see pdf_extraction); a
+       byte-identical copy of a stored resume is not parsed at all.
+    2) Match the rest against the user's resumes (see dedup) and handle
+       duplicates per the `duplicates` policy (allow, skip, link or replace).
+    3) Extract skills, several documents per OpenAI request (see llm_batching), with
+       at most SKILL_EXTRACTION_CONCURRENCY requests in flight.
+    4) Write all new resumes with a single insert_many.
+    With extract=False step 3 is skipped so skills can be extracted by a background
+    task; uploaded entries that still need skills have "skills_pending": True.
+    Returns (uploaded, failed, duplicate_reports); a bad file never aborts the rest of the batch.
+    """
+    user_id = str(current_user["_id"])
+    failed = []
+    pending = []
+
+    for file in files:
+        if file.content_type != "application/pdf":
+            failed.append({
+                "filename": file.filename,
+                "error": f"Only PDF files are allowed. File is {file.content_type}.",
+                "status_code": 400
+            })
+            continue
+        pending.append(file)
+
+    # 1. Parse PDFs in parallel, except exact copies of stored resumes
+    stored_copies = {}  # content sha256 -> existing resume
+
+    async def is_stored_copy(content_sha256: str) -> bool:
+        existing = await run_in_threadpool(dedup.find_by_content_hash, user_id, content_sha256)
+        if existing is not None:
+            stored_copies[content_sha256] = existing
+        return existing is not None
+
+    skip_parse = None if duplicates == "allow" else is_stored_copy
+    extractions = await asyncio.gather(
+        *(extract_upload(file, skip_parse=skip_parse) for file in pending),
+        return_exceptions=True
+    )
+
+    # 2. Classify every parsed file as new or as a duplicate
+    new_resumes = []    # (resume_doc, extraction)
+    links = []          # (link_doc, extraction)
+    replacements = []   # (existing resume, fields to set, extraction)
+    reports = []
+    batch_copies = {}   # content or text sha256 -> (position, filename), for copies within this batch
+    for position, (file, extraction) in enumerate(zip(pending, extractions)):
+        if isinstance(extraction, Exception):
+            failed.append(_failure(file.filename, extraction, "processing PDF"))
+            continue
+        resume_doc = {
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "user_id": user_id,
+            "username": current_user["username"],
+            "content_sha256": extraction["sha256"],
+        }
+        if extraction["text"] is not None:
+            resume_doc["resume_text"] = extraction["text"]
+            resume_doc.update(dedup.fingerprint_fields(extraction["text"], extraction["sha256"]))
+
+        if duplicates != "allow":
+            # The first copy is handled by the policy; later copies in the same
+            # batch are skipped, as there is no stored resume to link to or
+            # replace yet (or it was just replaced by the first copy)
+            copy_of = None
+            for key in (extraction["sha256"], resume_doc.get("text_sha256")):
+                if key is not None:
+                    first, filename = batch_copies.setdefault(key, (position, file.filename))
+                    if first != position and copy_of is None:
+                        copy_of = filename
+            if copy_of is not None:
+                reports.append({"filename": file.filename, "duplicate_of_file": copy_of,
+                                "match": "exact", "action": "skipped"})
+                continue
+
+        existing, match = None, None
+        if extraction["text"] is None:
+            existing, match = stored_copies[extraction["sha256"]], "exact"
+        elif duplicates != "allow":
+            existing, match = await run_in_threadpool(dedup.find_duplicate, user_id, resume_doc)
+
+        if existing is None:
+            new_resumes.append((resume_doc, extraction))
+            continue
+
+        report = {"filename": file.filename, "duplicate_of": str(existing["_id"]), "match": match}
+        if duplicates == "skip":
+            report["action"] = "skipped"
+        elif duplicates == "link" and match == "exact":
+            report["action"] = "linked"
+            links.append((dedup.link_document(existing, resume_doc), extraction))
+        elif duplicates == "link":
+            # A near-duplicate's own text and skills would be lost in a link
+            report["action"] = "stored"
+            new_resumes.append((resume_doc, extraction))
+        else:
+            report["action"] = "replaced"
+            fields = {k: v for k, v in resume_doc.items() if k not in ("user_id", "username")}
+            replacements.append((existing, fields, extraction))
+        reports.append(report)
+
+    # 3. Extract skills in batched requests with bounded concurrency. Replacements
+    # with the same text keep their skills; near-duplicates are re-extracted.
+    to_extract = [doc for doc, _ in new_resumes] + [
+        fields for existing, fields, _ in replacements
+        if "resume_text" in fields and fields["text_sha256"] != existing.get("text_sha256")
+    ]
+    to_extract_ids = {id(doc) for doc in to_extract}
+    if extract and to_extract:
+        with metrics.timed("skill_extraction"):
+            all_skills = await extract_skills_batched(
+                [doc["resume_text"] for doc in to_extract], concurrency=SKILL_EXTRACTION_CONCURRENCY
+            )
+        extracted_ids = set()
+        for doc, skills in zip(to_extract, all_skills):
+            if isinstance(skills, Exception):
+                failed.append(_failure(doc["filename"], skills, "extracting skills"))
+                continue
+            doc["skills"] = skills
+            doc["skill_ids"] = await run_in_threadpool(skill_registry.skill_ids, skills)
+            doc.update(skill_embedding_fields(skills))
+            extracted_ids.add(id(doc))
+        new_resumes = [(doc, e) for doc, e in new_resumes if id(doc) in extracted_ids]
+        replacements = [
+            (existing, fields, e) for existing, fields, e in replacements
+            if id(fields) in extracted_ids or id(fields) not in to_extract_ids
+        ]
+    pending_ids = set() if extract else to_extract_ids
+
+    # 4. Write new resumes and links in one bulk insert, update replaced ones.
+    # Text goes to the compressed blob collection first (see resume_blobs), so a
+    # stored resume always has its text.
+    uploaded = []
+    inserts = new_resumes + links
+    for doc, _ in inserts:
+        doc["_id"] = ObjectId()
+    for existing, fields, _ in replacements:
+        fields.update(_id=existing["_id"], user_id=user_id)
+    replaced_texts = [fields for _, fields, _ in replacements if "resume_text" in fields]
+    if new_resumes:
+        await run_in_threadpool(resume_blobs.insert_many, [doc for doc, _ in new_resumes])
+    for fields in replaced_texts:
+        await run_in_threadpool(resume_blobs.put, fields)
+    if inserts:
+        await repositories.insert_resumes_async([_without_text(doc) for doc, _ in inserts])
+    to_index = [doc for doc, _ in new_resumes if "skill_ids" in doc]
+    for existing, fields, _ in replacements:
+        # Also drops the text of a resume stored before resume_blobs existed
+        await repositories.update_resume_async(
+            existing["_id"], _without_text(fields, "_id", "user_id"), unset=["resume_text"]
+        )
+        # Reindexed even when the skills are unchanged: postings carry the filename
+        if id(fields) in pending_ids:
+            continue
+        fields.setdefault("skills", existing.get("skills", []))
+        skill_ids = fields.get("skill_ids", existing.get("skill_ids"))
+        if skill_ids is not None:
+            to_index.append({**fields, "skill_ids": skill_ids})
+
+    # Links are not indexed: matching and search only see the original
+    to_index_text = [doc for doc, _ in new_resumes] + replaced_texts
+    if to_index_text:
+        with metrics.timed("text_indexing"):
+            await run_in_threadpool(text_search.index_resumes, to_index_text)
+    if to_index:
+        with metrics.timed("skill_indexing"):
+            await run_in_threadpool(skill_index.index_resumes, to_index)
+
+    for doc, extraction in inserts + [(fields, e) for _, fields, e in replacements]:
+        entry = {
+            "filename": doc["filename"],
+            "resume_id": str(doc["_id"]),
+            "extracted_skills": doc.get("skills", []),
+            "pdf_timings": extraction["timings"],
+            "skills_pending": id(doc) in pending_ids,
+        }
+        if "duplicate_of" in doc:
+            entry["duplicate_of"] = str(doc["duplicate_of"])
+        uploaded.append(entry)
+
+    return uploaded, failed, reports
+
+def _without_text(doc: dict, *exclude) -> dict:
+    return {key: value for key, value in doc.items() if key != "resume_text" and key not in exclude}
+
+def enqueue_skill_extraction(resume_ids: list, user_id: str) -> str:
+    """Queue background skill extraction for freshly stored resumes. Returns the task ID."""
+    return enqueue_task(
+        "extract_resume_skills",
+        user_id,
+        {"resume_ids": resume_ids},
+        total=len(resume_ids)
+    )
+
+@task_handler("extract_resume_skills")
+async def extract_resume_skills_task(task: dict):
+    """
+    Background task: extract and store skills for each resume in the payload,
+    in batched OpenAI requests, with per-resume progress reporting.
+    """
+    resumes = []
+    for resume_id in task["payload"]["resume_ids"]:
+        resume = await repositories.find_resume_async(
+            resume_id, {"resume_text": 1, "user_id": 1, "filename": 1}
+        )
+        if resume is None:
+            error = {"resume_id": str(resume_id), "error": "Resume not found"}
+            await run_in_threadpool(update_progress, task["_id"], failed=1, error=error)
+        else:
+            resumes.append(resume)
+    await run_in_threadpool(resume_blobs.attach_texts, resumes)
+
+    with metrics.timed("skill_extraction"):
+        all_skills = await extract_skills_batched(
+            [resume.get("resume_text", "") for resume in resumes],
+            concurrency=SKILL_EXTRACTION_CONCURRENCY
+        )
+
+    for resume, skills in zip(resumes, all_skills):
+        try:
+            if isinstance(skills, Exception):
+                raise skills
+            ids = await run_in_threadpool(skill_registry.skill_ids, skills)
+            await repositories.update_resume_async(
+                resume["_id"], {"skills": skills, "skill_ids": ids, **skill_embedding_fields(skills)}
+            )
+            resume["skills"], resume["skill_ids"] = skills, ids
+            with metrics.timed("skill_indexing"):
+                await run_in_threadpool(skill_index.index_resume, resume)
+            await run_in_threadpool(update_progress, task["_id"], completed=1)
+        except Exception as e:
+            error = {"resume_id": str(resume["_id"]), "error": str(getattr(e, "detail", e))}
+            await run_in_threadpool(update_progress, task["_id"], failed=1, error=error)
@@ -0,0 +1,85 @@
+# backend/semantic_match.py
+
+import os
+import numpy as np
+from db import db
+from embeddings import embed_skills, from_binary, get_embedder, profile_vector
+from ttl_cache import TTLCache
+import shared_cache
+from vector_index import IVFIndex
+
+# A job skill counts as matched when some resume skill is at least this similar
+# (cosine), so "postgres" matches "postgresql" and "react" matches "react.js".
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("SEMANTIC_MATCH_THRESHOLD", "0.6"))
+# Nearest neighbours fetched from the vector index per requested result before re-ranking.
+SEMANTIC_CANDIDATE_FACTOR = int(os.getenv("SEMANTIC_CANDIDATE_FACTOR", "4"))
+
+_indexes = TTLCache(maxsize=256, ttl=60)
+
+class UserVectorIndex:
+    """A user's resume profile vectors in an IVF index, plus the skills needed for re-ranking."""
+
+    def __init__(self, resumes: list):
+        model = get_embedder().name
+        self.resumes = {}
+        vectors = []
+        for resume in resumes:
+            if resume.get("embedding_model") == model and resume.get("skill_embedding"):
+                vectors.append(from_binary(resume["skill_embedding"]))
+            else:
+                # Stored before embeddings existed or with another model
+                vectors.append(profile_vector(resume["skills"]))
+            self.resumes[resume["_id"]] = (resume.get("filename"), resume["skills"])
+        dim = get_embedder().dim
+        self.index = IVFIndex(
+            np.stack(vectors) if vectors else np.zeros((0, dim), dtype=np.float32),
+            list(self.resumes)
+        )
+
+def get_user_index(user_id: str) -> UserVectorIndex:
+    # Read before building, so a change made meanwhile still invalidates the result
+    generation = shared_cache.generation(f"semantic_index:{user_id}")
+    cached = _indexes.get(user_id)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    resumes = db.resumes.find(
+        {"user_id": user_id, "skills.0": {"$exists": True}, "duplicate_of": {"$exists": False}},
+        {"filename": 1, "skills": 1, "skill_embedding": 1, "embedding_model": 1}
+    )
+    index = UserVectorIndex(list(resumes))
+    _indexes.set(user_id, (generation, index))
+    return index
+
+def invalidate_user(user_id: str):
+    _indexes.delete(user_id)
+    shared_cache.bump_generation(f"semantic_index:{user_id}")
+
+def top_matches(user_id: str, job_skills: set, limit: int) -> list:
+    """
+    Semantic ranking: fetch the nearest resumes to the job's skill profile from the
+    vector index, then score each by the fraction of job skills it has a similar skill for.
+    """
+    if not job_skills:
+        return []
+    job_skill_list = sorted(job_skills)
+    job_vectors = embed_skills(job_skill_list)
+    user_index = get_user_index(user_id)
+
+    results = []
+    for resume_id, similarity in user_index.index.search(
+        profile_vector(job_skill_list), limit * SEMANTIC_CANDIDATE_FACTOR
+    ):
+        filename, resume_skills = user_index.resumes[resume_id]
+        best = (job_vectors @ embed_skills(resume_skills).T).max(axis=1)
+        matched = [skill for skill, score in zip(job_skill_list, best) if score >= SEMANTIC_MATCH_THRESHOLD]
+        if matched:
+            results.append({
+                "resume_id": resume_id,
+                "filename": filename,
+                "overlap_score": len(matched) / len(job_skill_list),
+                "matched_skills": matched,
+                "similarity": similarity,
+            })
+
+    results.sort(key=lambda r: (r["overlap_score"], r["similarity"]), reverse=True)
+    return results[:limit]
@@ -0,0 +1,52 @@
+# backend/serve.py
+
+import argparse
+import os
+import uvicorn
+
+# Production entry point: several uvicorn worker processes behind one socket.
+#   python serve.py --workers 4 --port 8000
+# The parent creates the indexes and seeds the skill registry once, then starts
+# the workers with SKIP_INDEX_CHECKS so they go straight to warming up (see
+# main.lifespan). Per-process pools are split between the workers, and caches
+# move to the shared SQLite store (see shared_cache) so a lookup one worker made
+# is a hit for the others. Environment variables that are already set win.
+# On SIGTERM each worker stops accepting connections, finishes its in-flight
+# requests, then gives running background tasks DRAIN_TIMEOUT_SECONDS before
+# they are requeued for the next worker to pick up.
+
+def _share(name: str, workers: int):
+    """Split a per-process pool size that defaults to the CPU count between the workers."""
+    os.environ.setdefault(name, str(max(1, (os.cpu_count() or 1) // workers)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+
+    if workers > 1:
+        os.environ.setdefault("SHARED_CACHE", "sqlite")
+        _share("PDF_PARSE_WORKERS", workers)
+        _share("PASSWORD_HASH_CONCURRENCY", workers)
+
+    # Imported only now so the settings above apply to this process too
+    import db
+    import main as app_module
+    app_module.prepare_database()
+    # Workers are spawned, not forked, and open their own clients
+    db.client.close()
+    os.environ["SKIP_INDEX_CHECKS"] = "true"
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=int(app_module.DRAIN_TIMEOUT_SECONDS),
+    )
+
+if __name__ == "__main__":
+    main()
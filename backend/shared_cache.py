@@ -0,0 +1,161 @@
+# backend/shared_cache.py
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import bson
+from ttl_cache import TTLCache
+
+# Caches that every worker process on a host can share. With SHARED_CACHE=sqlite
+# (set by serve.py when it runs several workers) entries live in one SQLite file
+# in WAL mode: reads don't block each other or the writer, and an entry one
+# worker fetched is a hit for all the others. With SHARED_CACHE=memory (the
+# default for a single process) caches are plain in-process TTLCaches.
+#
+# Structures too large or too cheap to serialize (skill matrices, vector
+# indexes) stay per process. Their invalidations go through generation
+# counters here, so a change made in one worker reaches all of them.
+
+SHARED_CACHE = os.getenv("SHARED_CACHE", "memory").lower()
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "resume_screener_cache.sqlite3")
+)
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+
+_local = threading.local()
+
+def _connection() -> sqlite3.Connection:
+    """One autocommit connection per thread (sqlite3 connections are not thread-safe)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expiry ON cache (namespace, expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS generations (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        _local.conn = conn
+    return conn
+
+class SQLiteCache:
+    """
+    TTLCache's interface over the shared SQLite file. Values are stored as BSON,
+    so Mongo documents (ObjectIds, datetimes) round-trip. Past maxsize the entries
+    closest to expiry are evicted. The cache is best effort: if SQLite stays
+    locked past the busy timeout, a lookup is a miss and a write is dropped.
+    Hit/miss counters are per process.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 300.0):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        # Evict once every this many writes instead of counting rows on each one
+        self._prune_every = max(1, maxsize // 10)
+
+    def get(self, key, default=None):
+        try:
+            row = _connection().execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at >= ?",
+                (self.namespace, str(key), time.time())
+            ).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return bson.decode(row[0])["v"]
+
+    def set(self, key, value):
+        try:
+            _connection().execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, str(key), bson.encode({"v": value}), time.time() + self.ttl)
+            )
+            self._writes += 1
+            if self._writes % self._prune_every == 0:
+                self._prune()
+        except sqlite3.OperationalError:
+            pass
+
+    def _prune(self):
+        conn = _connection()
+        conn.execute("DELETE FROM cache WHERE namespace = ? AND expires_at < ?", (self.namespace, time.time()))
+        excess = len(self) - self.maxsize
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ? ORDER BY expires_at LIMIT ?)",
+                (self.namespace, self.namespace, excess)
+            )
+            self.evictions += excess
+
+    def delete(self, key):
+        try:
+            _connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, str(key)))
+        except sqlite3.OperationalError:
+            pass
+
+    def clear(self):
+        _connection().execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self):
+        return _connection().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def cache(namespace: str, maxsize: int, ttl: float):
+    """A cache shared by the workers on this host when SHARED_CACHE=sqlite, else a per-process TTLCache."""
+    if SHARED_CACHE == "sqlite":
+        return SQLiteCache(namespace, maxsize, ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
+
+# ---- generation counters ----
+
+_generations = {}
+_generations_lock = threading.Lock()
+
+def generation(key: str) -> int:
+    """Current generation of a key; per-process caches compare it with the one they were built at."""
+    if SHARED_CACHE != "sqlite":
+        return _generations.get(key, 0)
+    try:
+        row = _connection().execute("SELECT value FROM generations WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        # Unknown: report a generation no cache entry was built at, so it is rebuilt
+        return -1
+    return row[0] if row else 0
+
+def bump_generation(key: str):
+    """Mark everything built from a key's data as stale, in every worker."""
+    if SHARED_CACHE != "sqlite":
+        with _generations_lock:
+            _generations[key] = _generations.get(key, 0) + 1
+        return
+    _connection().execute(
+        "INSERT INTO generations (key, value) VALUES (?, 1)"
+        " ON CONFLICT (key) DO UPDATE SET value = value + 1",
+        (key,)
+    )
@@ -0,0 +1,82 @@
+# backend/skill_cache.py
+
+import hashlib
+import os
+import re
+import unicodedata
+from datetime import datetime, timezone
+from db import db
+import shared_cache
+
+# Entries expire from Mongo after this many seconds (enforced by a TTL index).
+SKILL_CACHE_TTL_SECONDS = int(os.getenv("SKILL_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+SKILL_CACHE_MEMORY_SIZE = int(os.getenv("SKILL_CACHE_MEMORY_SIZE", "4096"))
+SKILL_CACHE_MEMORY_TTL_SECONDS = int(os.getenv("SKILL_CACHE_MEMORY_TTL_SECONDS", "3600"))
+# Set to "false" to always call the LLM (e.g. benchmarks without a database).
+SKILL_CACHE_ENABLED = os.getenv("SKILL_CACHE_ENABLED", "true").lower() == "true"
+
+# In front of Mongo; shared by the workers on a host with SHARED_CACHE=sqlite
+_memory = shared_cache.cache("skills", SKILL_CACHE_MEMORY_SIZE, SKILL_CACHE_MEMORY_TTL_SECONDS)
+_counters = {"memory_hits": 0, "mongo_hits": 0, "misses": 0}
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies of a document share a cache key."""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+def cache_key(text: str, model: str, prompt_version: str) -> str:
+    """SHA-256 over the normalized text plus the model and prompt that produced the skills."""
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def ensure_indexes():
+    """Create the TTL index that evicts stale cache entries (idempotent)."""
+    db.skill_cache.create_index("created_at", expireAfterSeconds=SKILL_CACHE_TTL_SECONDS)
+
+def get_cached_skills(key: str):
+    """Look up skills in memory first, then Mongo. Returns None on a miss."""
+    if not SKILL_CACHE_ENABLED:
+        return None
+    skills = _memory.get(key)
+    if skills is not None:
+        _counters["memory_hits"] += 1
+        return skills
+
+    doc = db.skill_cache.find_one({"_id": key}, {"skills": 1})
+    if doc is not None:
+        _counters["mongo_hits"] += 1
+        _memory.set(key, doc["skills"])
+        return doc["skills"]
+
+    _counters["misses"] += 1
+    return None
+
+def store_skills(key: str, skills: list, model: str, prompt_version: str):
+    """Write extracted skills through both cache tiers."""
+    if not SKILL_CACHE_ENABLED:
+        return
+    _memory.set(key, skills)
+    db.skill_cache.update_one(
+        {"_id": key},
+        {"$set": {
+            "skills": skills,
+            "model": model,
+            "prompt_version": prompt_version,
+            "created_at": datetime.now(timezone.utc),
+        }},
+        upsert=True
+    )
+
+def stats() -> dict:
+    lookups = sum(_counters.values())
+    hits = _counters["memory_hits"] + _counters["mongo_hits"]
+    return {
+        **_counters,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "memory": _memory.stats(),
+    }
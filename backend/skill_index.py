@@ -0,0 +1,90 @@
+# backend/skill_index.py
+
+from db import db
+import skill_matrix
+import semantic_match
+import skill_registry
+import match_results
+
+# Inverted index from skill to resume, one posting document per (resume, skill):
+#   {"user_id": ..., "skill_id": 1, "resume_id": ObjectId, "filename": "cv.pdf"}
+# Skills are canonical registry IDs (see skill_registry).
+# Materialized match results and the per-user matrices are derived from the
+# postings and updated here, so resumes that share no skill with a job (and
+# their resume_text) are never loaded for matching.
+
+def _invalidate(user_id: str):
+    """Drop the per-user structures derived from the index."""
+    skill_matrix.invalidate_user(user_id)
+    semantic_match.invalidate_user(user_id)
+
+def ensure_indexes():
+    db.resume_skills.create_index([("user_id", 1), ("skill_id", 1)])
+    db.resume_skills.create_index("resume_id")
+
+def _skill_ids(resume: dict) -> list:
+    ids = resume.get("skill_ids")
+    if ids is None:
+        # Stored before the skill registry existed
+        ids = skill_registry.skill_ids(resume.get("skills") or [])
+    return ids
+
+def _postings(resume: dict, ids: list) -> list:
+    return [
+        {
+            "user_id": resume["user_id"],
+            "skill_id": skill_id,
+            "resume_id": resume["_id"],
+            "filename": resume.get("filename"),
+        }
+        for skill_id in set(ids)
+    ]
+
+def index_resumes(resumes: list):
+    """
+    (Re)index resumes after their skills were stored. Each resume needs
+    '_id', 'user_id', 'filename' and 'skill_ids' (or 'skills').
+    """
+    if not resumes:
+        return
+    db.resume_skills.delete_many({"resume_id": {"$in": [r["_id"] for r in resumes]}})
+    by_user = {}
+    postings = []
+    for resume in resumes:
+        ids = _skill_ids(resume)
+        postings.extend(_postings(resume, ids))
+        by_user.setdefault(resume["user_id"], []).append((resume["_id"], resume.get("filename"), ids))
+    if postings:
+        db.resume_skills.insert_many(postings, ordered=False)
+    for user_id, user_resumes in by_user.items():
+        match_results.update_resumes(user_id, user_resumes)
+        _invalidate(user_id)
+
+def index_resume(resume: dict):
+    index_resumes([resume])
+
+def remove_resume(resume_id, user_id: str):
+    db.resume_skills.delete_many({"resume_id": resume_id})
+    match_results.remove_resume(resume_id)
+    _invalidate(user_id)
+
+def rebuild_user_index(user_id: str) -> int:
+    """Rebuild the postings of every resume owned by a user. Returns the resume count."""
+    resumes = list(db.resumes.find(
+        # Duplicate links (see dedup) are matched through their original
+        {"user_id": user_id, "duplicate_of": {"$exists": False}},
+        {"user_id": 1, "filename": 1, "skills": 1, "skill_ids": 1}
+    ))
+    db.resume_skills.delete_many({"user_id": user_id})
+    match_results.clear_user(user_id)
+    index_resumes(resumes)
+    _invalidate(user_id)
+    return len(resumes)
+
+if __name__ == "__main__":
+    # Backfill the index for resumes stored before it existed:
+    #   python skill_index.py
+    ensure_indexes()
+    user_ids = db.resumes.distinct("user_id")
+    total = sum(rebuild_user_index(user_id) for user_id in user_ids)
+    print(f"Indexed {total} resumes for {len(user_ids)} users")
@@ -0,0 +1,134 @@
+# backend/skill_matrix.py
+
+import os
+import numpy as np
+from db import db
+from ttl_cache import TTLCache
+import shared_cache
+
+# Per-user matrices are rebuilt after a resume's skills change in any worker on
+# this host (see shared_cache generations); the TTL bounds staleness when a
+# process elsewhere changed them.
+SKILL_MATRIX_CACHE_SIZE = int(os.getenv("SKILL_MATRIX_CACHE_SIZE", "256"))
+SKILL_MATRIX_CACHE_TTL_SECONDS = int(os.getenv("SKILL_MATRIX_CACHE_TTL_SECONDS", "60"))
+# Upper bound on the temporary (jobs x resumes x words) array built while scoring.
+SCORING_CHUNK_BYTES = 64 * 1024 * 1024
+
+_matrices = TTLCache(maxsize=SKILL_MATRIX_CACHE_SIZE, ttl=SKILL_MATRIX_CACHE_TTL_SECONDS)
+
+class SkillMatrix:
+    """
+    A user's resumes encoded as a bit-packed (resumes x vocabulary) matrix.
+    Every skill (a registry ID) gets a column; row i has bit j set when resume i has skill j.
+    Overlap with a job is popcount(row & job_bits), computed for all rows at once.
+    """
+
+    def __init__(self, resume_ids: list, filenames: list, resume_skills: list):
+        self.resume_ids = resume_ids
+        self.filenames = filenames
+        self.vocabulary = {}
+        for skills in resume_skills:
+            for skill in skills:
+                self.vocabulary.setdefault(skill, len(self.vocabulary))
+        self.skills = list(self.vocabulary)
+
+        dense = np.zeros((len(resume_ids), max(len(self.vocabulary), 1)), dtype=bool)
+        for row, skills in enumerate(resume_skills):
+            dense[row, [self.vocabulary[skill] for skill in skills]] = True
+        self.bits = self._pack(dense)
+
+    @staticmethod
+    def _pack(dense: np.ndarray) -> np.ndarray:
+        """Pack a boolean (rows x vocabulary) array into uint64 words."""
+        packed = np.packbits(dense, axis=1)
+        padding = (-packed.shape[1]) % 8
+        if padding:
+            packed = np.pad(packed, ((0, 0), (0, padding)))
+        return np.ascontiguousarray(packed).view(np.uint64)
+
+    def encode(self, skill_sets: list) -> np.ndarray:
+        """Encode job skill sets as packed rows; skills unknown to the vocabulary are dropped."""
+        dense = np.zeros((len(skill_sets), max(len(self.vocabulary), 1)), dtype=bool)
+        for row, skills in enumerate(skill_sets):
+            columns = [self.vocabulary[s] for s in skills if s in self.vocabulary]
+            dense[row, columns] = True
+        return self._pack(dense)
+
+    def _decode(self, word_row: np.ndarray) -> list:
+        unpacked = np.unpackbits(word_row.view(np.uint8))[:len(self.skills)]
+        return [self.skills[i] for i in np.flatnonzero(unpacked)]
+
+    def top_matches(self, job_skill_sets: list, limit: int) -> list:
+        """
+        Score every job against every resume in one vectorized pass and return,
+        per job, the top `limit` resumes with a non-zero overlap:
+        [{"resume_id", "filename", "overlap_score", "matched_skills"}, ...]
+        """
+        if not job_skill_sets:
+            return []
+        job_bits = self.encode(job_skill_sets)
+        job_sizes = np.array([len(skills) for skills in job_skill_sets], dtype=np.float64)
+        num_resumes, num_words = self.bits.shape
+        if num_resumes == 0:
+            return [[] for _ in job_skill_sets]
+
+        rows_per_chunk = max(1, SCORING_CHUNK_BYTES // (num_resumes * num_words * 8))
+        overlap = np.empty((len(job_skill_sets), num_resumes), dtype=np.int32)
+        for start in range(0, len(job_skill_sets), rows_per_chunk):
+            chunk = job_bits[start:start + rows_per_chunk]
+            overlap[start:start + len(chunk)] = np.bitwise_count(
+                chunk[:, None, :] & self.bits[None, :, :]
+            ).sum(axis=2, dtype=np.int32)
+
+        results = []
+        k = min(limit, num_resumes)
+        rows = np.arange(num_resumes, dtype=np.int64)
+        for job_row, counts in enumerate(overlap):
+            # Highest overlap first, ties in stable row order. The tie-break is part
+            # of the partition key, so the top k is the same prefix for every k and
+            # pages taken with different limits line up.
+            order = -counts.astype(np.int64) * num_resumes + rows
+            candidates = np.argpartition(order, k - 1)[:k] if k < num_resumes else rows
+            candidates = candidates[np.argsort(order[candidates])]
+            candidates = candidates[counts[candidates] > 0]
+            results.append([
+                {
+                    "resume_id": self.resume_ids[i],
+                    "filename": self.filenames[i],
+                    "overlap_score": float(counts[i] / job_sizes[job_row]) if job_sizes[job_row] else 0.0,
+                    "matched_skills": self._decode(self.bits[i] & job_bits[job_row]),
+                }
+                for i in candidates
+            ])
+        return results
+
+def build_user_matrix(user_id: str) -> SkillMatrix:
+    """Build a user's matrix from the skill index postings (no resume text is read)."""
+    resume_rows = {}
+    for posting in db.resume_skills.find(
+        {"user_id": user_id},
+        {"_id": 0, "resume_id": 1, "skill_id": 1, "filename": 1}
+    ):
+        row = resume_rows.setdefault(posting["resume_id"], (posting.get("filename"), []))
+        row[1].append(posting["skill_id"])
+
+    resume_ids = sorted(resume_rows)
+    return SkillMatrix(
+        resume_ids,
+        [resume_rows[rid][0] for rid in resume_ids],
+        [resume_rows[rid][1] for rid in resume_ids]
+    )
+
+def get_user_matrix(user_id: str) -> SkillMatrix:
+    # Read before building, so a change made meanwhile still invalidates the result
+    generation = shared_cache.generation(f"skill_matrix:{user_id}")
+    cached = _matrices.get(user_id)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    matrix = build_user_matrix(user_id)
+    _matrices.set(user_id, (generation, matrix))
+    return matrix
+
+def invalidate_user(user_id: str):
+    _matrices.delete(user_id)
+    shared_cache.bump_generation(f"skill_matrix:{user_id}")
@@ -0,0 +1,184 @@
+# backend/skill_registry.py
+
+import re
+import threading
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from db import db
+from embeddings import skill_embedding_fields
+from skill_taxonomy import SKILL_TAXONOMY
+
+# Canonical skill registry: every distinct canonical skill name gets a compact
+# integer ID in the `skills` collection ({"_id": 17, "name": "postgresql"}).
+# Spelling variants and abbreviations ("postgres", "PostgreSQL ", "k8s") are
+# mapped to the taxonomy's canonical name before an ID is assigned, so resumes
+# and jobs store small, comparable integer sets. Separate tools keep separate
+# IDs even when they are related ("helm" is not "kubernetes").
+
+# Longer "skills" are almost always a whole unparsed model reply, not a skill.
+MAX_SKILL_LENGTH = 60
+
+_SEPARATORS = re.compile(r"[\s_\-]+")
+_LIST_SEPARATORS = re.compile(r"[,;|\n]+|\s[•·]\s")
+_CODE_FENCE = re.compile(r"```[a-z]*")
+_STRIP_CHARS = " \t\r\n\"'`*•·-–;:,()[]{}"
+
+_lock = threading.Lock()
+_ids = {}    # canonical name -> ID
+_names = {}  # ID -> canonical name
+_loaded = False
+
+def _alias_key(name: str) -> str:
+    """Lookup key that ignores case and hyphen/underscore/space differences."""
+    return _SEPARATORS.sub(" ", name.lower()).strip()
+
+_ALIASES = {}
+for _canonical, _aliases in SKILL_TAXONOMY.items():
+    for _name in [_canonical, *_aliases]:
+        # A name may only ever stand for one skill (this also keeps a canonical
+        # skill from being listed as an alias of another)
+        if _ALIASES.setdefault(_alias_key(_name), _canonical) != _canonical:
+            raise ValueError(f"Skill name {_name!r} is listed under both {_ALIASES[_alias_key(_name)]!r} and {_canonical!r}")
+
+def normalize_skill(skill: str):
+    """
+    Canonical name for one raw skill string, or None when it is not a usable skill.
+    Known aliases map to the taxonomy's canonical name; other skills are
+    lowercased with whitespace and surrounding punctuation cleaned up.
+    """
+    if not isinstance(skill, str):
+        return None
+    name = " ".join(skill.lower().split()).strip(_STRIP_CHARS).rstrip(".")
+    if not name or len(name) > MAX_SKILL_LENGTH:
+        return None
+    return _ALIASES.get(_alias_key(name), name)
+
+def split_skills(text: str) -> list:
+    """
+    Best-effort split of a reply that isn't a JSON array ("Python, SQL\n- React")
+    into individual skills, instead of keeping the whole reply as one skill.
+    """
+    text = _CODE_FENCE.sub("", text)
+    return [part for part in _LIST_SEPARATORS.split(text) if part.strip(_STRIP_CHARS)]
+
+def canonicalize(skills: list) -> list:
+    """Canonical names for a list of raw skills, without duplicates, in input order."""
+    return list(dict.fromkeys(
+        name for name in map(normalize_skill, skills or []) if name is not None
+    ))
+
+def ensure_indexes():
+    db.skills.create_index("name", unique=True)
+
+def _load():
+    global _loaded
+    for doc in db.skills.find({}, {"name": 1}):
+        _ids[doc["name"]] = doc["_id"]
+        _names[doc["_id"]] = doc["name"]
+    _loaded = True
+
+def _register(name: str) -> int:
+    """Return the ID of a canonical name, allocating one if it is new."""
+    doc = db.skills.find_one({"name": name}, {"_id": 1})
+    if doc is None:
+        counter = db.counters.find_one_and_update(
+            {"_id": "skill_id"},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        try:
+            db.skills.insert_one({"_id": counter["seq"], "name": name})
+            doc = {"_id": counter["seq"]}
+        except DuplicateKeyError:
+            # Another process registered the same name first
+            doc = db.skills.find_one({"name": name}, {"_id": 1})
+    _ids[name] = doc["_id"]
+    _names[doc["_id"]] = name
+    return doc["_id"]
+
+def skill_ids(skills: list) -> list:
+    """
+    Canonicalize raw skills and return their integer IDs (registering unknown
+    skills), in the order of canonicalize(skills).
+    """
+    names = canonicalize(skills)
+    with _lock:
+        if not _loaded:
+            _load()
+        return [_ids[name] if name in _ids else _register(name) for name in names]
+
+def skill_names(ids) -> list:
+    """Canonical names for skill IDs (unknown IDs are skipped)."""
+    with _lock:
+        if any(skill_id not in _names for skill_id in ids):
+            _load()
+        return [_names[skill_id] for skill_id in ids if skill_id in _names]
+
+def preload() -> int:
+    """Load the whole registry into memory (on startup). Returns the number of skills."""
+    with _lock:
+        _load()
+        return len(_ids)
+
+def seed() -> int:
+    """Register every taxonomy skill so common skills get the smallest IDs. Returns the number added."""
+    with _lock:
+        _load()
+        missing = [name for name in SKILL_TAXONOMY if name not in _ids]
+        for name in missing:
+            _register(name)
+    return len(missing)
+
+def _migrate(collection, field: str, ids_field: str) -> tuple:
+    """
+    Canonicalize `field` and store `ids_field` on every document of a collection.
+    Only spelling variants are folded together, so no skill is replaced by a
+    different one; documents migrated while the taxonomy still folded related
+    tools together get them back by extracting their skills again.
+    """
+    updated, vocabulary_before, vocabulary_after = 0, set(), set()
+    operations = []
+    for doc in collection.find({field: {"$exists": True}}, {field: 1, ids_field: 1}):
+        raw = doc.get(field) or []
+        # Replies that failed to parse used to be stored as one long "skill"
+        skills = canonicalize([
+            part for skill in raw if isinstance(skill, str)
+            for part in (split_skills(skill) if len(skill) > MAX_SKILL_LENGTH else [skill])
+        ])
+        ids = skill_ids(skills)
+        vocabulary_before.update(s for s in raw if isinstance(s, str))
+        vocabulary_after.update(ids)
+        if skills == raw and doc.get(ids_field) == ids:
+            continue
+        fields = {field: skills, ids_field: ids}
+        if collection.name == "resumes":
+            fields.update(skill_embedding_fields(skills))
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if len(operations) >= 500:
+            collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    return updated, len(vocabulary_before), len(vocabulary_after)
+
+if __name__ == "__main__":
+    # One-off backfill for resumes and jobs stored with raw skill strings:
+    #   python skill_registry.py
+    import skill_index
+
+    ensure_indexes()
+    print(f"Seeded {seed()} taxonomy skills")
+    for collection, field, ids_field in (
+        (db.resumes, "skills", "skill_ids"),
+        (db.jobs, "required_skills", "required_skill_ids"),
+    ):
+        updated, before, after = _migrate(collection, field, ids_field)
+        print(f"{collection.name}: updated {updated} documents, vocabulary {before} -> {after} skills")
+
+    skill_index.ensure_indexes()
+    user_ids = db.resumes.distinct("user_id")
+    total = sum(skill_index.rebuild_user_index(user_id) for user_id in user_ids)
+    print(f"Reindexed {total} resumes for {len(user_ids)} users")
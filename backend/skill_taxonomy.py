@@ -0,0 +1,226 @@
+# backend/skill_taxonomy.py
+
+# Curated skill taxonomy: canonical (lowercase) skill name -> other names and
+# spelling variants of that same skill (synonyms, abbreviations, versions).
+# Related but separate tools ("helm" and "kubernetes", "pytest" and "unit
+# testing") are separate entries; relatedness is left to the semantic engine.
+# The canonical name itself is matched too, except for the ambiguous words in
+# AMBIGUOUS_NAMES, which are only recognized through their aliases.
+SKILL_TAXONOMY = {
+    # Programming languages
+    "python": ["python3", "python 3", "python2"],
+    "java": ["java 8", "java 11", "java 17", "core java"],
+    "java ee": ["j2ee", "jakarta ee"],
+    "javascript": ["js", "ecmascript", "es6", "es2015", "vanilla js"],
+    "typescript": [],
+    "go": ["golang", "go lang"],
+    "rust": ["rustlang"],
+    "c": ["c programming", "ansi c", "c language"],
+    "c++": ["cpp", "c plus plus", "c++11", "c++14", "c++17", "c++20"],
+    "c#": ["csharp", "c sharp"],
+    "ruby": [],
+    "php": [],
+    "swift": [],
+    "kotlin": [],
+    "scala": [],
+    "r": ["r programming", "r language"],
+    "matlab": [],
+    "perl": [],
+    "haskell": [],
+    "elixir": [],
+    "dart": [],
+    "bash": ["bash scripting"],
+    "shell scripting": ["shell script"],
+    "zsh": [],
+    "powershell": [],
+    "sql": ["structured query language"],
+    "t-sql": ["tsql", "transact-sql"],
+    "pl/sql": ["plsql"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "sass": ["scss"],
+    "assembly": ["x86 assembly", "asm"],
+    "solidity": [],
+    "objective-c": ["objective c", "objc"],
+    "lua": [],
+    "julia": [],
+    "fortran": [],
+    "cobol": [],
+    "vba": ["visual basic for applications"],
+
+    # Frontend
+    "react": ["react.js", "reactjs", "react js"],
+    "react native": [],
+    "angular": ["angular 2+"],
+    "angularjs": ["angular.js"],
+    "vue": ["vue.js", "vuejs", "vue 3"],
+    "svelte": [],
+    "sveltekit": [],
+    "next.js": ["nextjs", "next js"],
+    "redux": [],
+    "jquery": [],
+    "tailwind css": ["tailwind", "tailwindcss"],
+    "bootstrap": [],
+    "webpack": [],
+    "vite": [],
+    "flutter": [],
+
+    # Backend frameworks and runtimes
+    "node.js": ["nodejs", "node js"],
+    "express": ["express.js", "expressjs"],
+    "django": [],
+    "django rest framework": ["drf"],
+    "flask": [],
+    "fastapi": ["fast api"],
+    "spring": ["spring framework"],
+    "spring boot": ["springboot"],
+    "ruby on rails": ["rails", "ror"],
+    "laravel": [],
+    ".net": ["dotnet", ".net core"],
+    "asp.net": ["asp.net core"],
+    "graphql": [],
+    "rest api": ["rest apis", "restful", "restful api", "restful apis"],
+    "grpc": [],
+    "microservices": ["microservice", "micro-services"],
+
+    # Data stores
+    "postgresql": ["postgres", "postgre sql"],
+    "mysql": ["my sql"],
+    "sqlite": ["sqlite3"],
+    "mongodb": ["mongo", "mongo db"],
+    "redis": [],
+    "cassandra": ["apache cassandra"],
+    "elasticsearch": ["elastic search"],
+    "elk stack": [],
+    "opensearch": [],
+    "dynamodb": ["dynamo db"],
+    "oracle database": ["oracle db", "oracle sql"],
+    "sql server": ["mssql", "microsoft sql server", "ms sql"],
+    "snowflake": [],
+    "bigquery": ["big query"],
+    "neo4j": [],
+    "firebase": [],
+    "firestore": [],
+
+    # Cloud and DevOps
+    "aws": ["amazon web services"],
+    "ec2": ["amazon ec2"],
+    "s3": ["amazon s3"],
+    "aws lambda": [],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "docker": [],
+    "docker compose": ["docker-compose"],
+    "kubernetes": ["k8s"],
+    "helm": [],
+    "eks": ["amazon eks"],
+    "gke": ["google kubernetes engine"],
+    "aks": ["azure kubernetes service"],
+    "terraform": [],
+    "ansible": [],
+    "jenkins": [],
+    "github actions": [],
+    "gitlab ci": ["gitlab ci/cd"],
+    "ci/cd": ["cicd", "ci cd"],
+    "linux": [],
+    "unix": [],
+    "ubuntu": [],
+    "debian": [],
+    "centos": [],
+    "red hat enterprise linux": ["rhel"],
+    "nginx": [],
+    "git": [],
+    "github": [],
+    "gitlab": [],
+    "bitbucket": [],
+    "prometheus": [],
+    "grafana": [],
+    "serverless": [],
+
+    # Data and ML
+    "machine learning": ["ml", "machine-learning"],
+    "deep learning": ["deep-learning"],
+    "neural networks": ["neural network"],
+    "natural language processing": ["nlp"],
+    "computer vision": [],
+    "opencv": [],
+    "data analysis": ["data analytics"],
+    "data science": [],
+    "data engineering": [],
+    "etl": [],
+    "statistics": ["statistical analysis", "statistical modeling"],
+    "pandas": [],
+    "numpy": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pytorch": [],
+    "tensorflow": [],
+    "keras": [],
+    "apache spark": ["spark"],
+    "pyspark": [],
+    "hadoop": ["apache hadoop"],
+    "hdfs": [],
+    "mapreduce": [],
+    "kafka": ["apache kafka"],
+    "airflow": ["apache airflow"],
+    "dbt": [],
+    "large language models": ["llm", "llms"],
+    "openai api": [],
+    "langchain": [],
+    "tableau": [],
+    "power bi": ["powerbi"],
+    "excel": ["microsoft excel", "ms excel"],
+    "jupyter": ["jupyter notebook", "jupyter notebooks"],
+
+    # Testing and practices
+    "unit testing": ["unit tests", "unit test"],
+    "pytest": [],
+    "junit": [],
+    "jest": [],
+    "mocha": [],
+    "test automation": ["automated testing"],
+    "selenium": [],
+    "cypress": [],
+    "playwright": [],
+    "agile": [],
+    "scrum": [],
+    "kanban": [],
+    "object-oriented programming": ["oop", "object oriented programming"],
+    "data structures": ["data structures and algorithms"],
+    "algorithms": [],
+    "system design": [],
+    "distributed systems": [],
+    "security": ["cybersecurity", "cyber security", "information security"],
+    "networking": ["computer networking"],
+    "tcp/ip": [],
+
+    # Design and product
+    "figma": [],
+    "ui/ux design": ["ui/ux", "ux/ui design"],
+    "product management": [],
+    "project management": [],
+    "jira": [],
+    "confluence": [],
+
+    # Business and soft skills
+    "communication": ["communication skills", "written communication", "verbal communication"],
+    "leadership": ["team leadership"],
+    "people management": [],
+    "teamwork": ["team work"],
+    "collaboration": [],
+    "problem solving": ["problem-solving"],
+    "troubleshooting": [],
+    "customer service": ["customer support"],
+    "sales": [],
+    "marketing": [],
+    "digital marketing": [],
+    "content marketing": [],
+    "seo": ["search engine optimization"],
+    "sem": ["search engine marketing"],
+    "accounting": [],
+    "bookkeeping": [],
+    "financial analysis": [],
+    "financial modeling": ["financial modelling"],
+    "public speaking": [],
+}
+
+AMBIGUOUS_NAMES = {"go", "c", "r"}
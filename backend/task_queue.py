@@ -0,0 +1,196 @@
+# backend/task_queue.py
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from db import db
+
+# Background work is stored in the 'tasks' collection so it survives restarts and
+# can be picked up by any API process; no extra queue service is needed.
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))
+TASK_POLL_INTERVAL_SECONDS = float(os.getenv("TASK_POLL_INTERVAL_SECONDS", "1.0"))
+# A running task whose lease expired (e.g. the process died) is picked up again.
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "600"))
+
+_handlers = {}
+_workers = []
+_wakeup = None
+_loop = None
+_stopping = False
+
+def task_handler(task_type: str):
+    """Register an async function as the handler for a task type."""
+    def decorator(func):
+        _handlers[task_type] = func
+        return func
+    return decorator
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def ensure_indexes():
+    db.tasks.create_index([("status", 1), ("created_at", 1)])
+    db.tasks.create_index("user_id")
+    # At most one queued or running task per key (see enqueue_task's `exclusive`)
+    db.tasks.create_index(
+        "active_key", unique=True, partialFilterExpression={"active_key": {"$exists": True}}
+    )
+
+def enqueue_task(task_type: str, user_id: str, payload: dict, total: int = 0, exclusive: bool = False):
+    """
+    Insert a queued task and wake up local workers. Returns the task ID. With
+    exclusive=True the task is only queued if the user has no queued or running
+    task of the same type; otherwise nothing is inserted and None is returned.
+    """
+    task_doc = {
+        "type": task_type,
+        "user_id": user_id,
+        "payload": payload,
+        "status": "queued",
+        "total": total,
+        "completed": 0,
+        "failed": 0,
+        "errors": [],
+        "created_at": _now(),
+    }
+    if exclusive:
+        # Unset when the task finishes; the unique index makes the check atomic
+        task_doc["active_key"] = f"{task_type}:{user_id}"
+    try:
+        result = db.tasks.insert_one(task_doc)
+    except DuplicateKeyError:
+        return None
+    if _wakeup is not None:
+        # May be called from a threadpool thread, so hop onto the workers' loop
+        _loop.call_soon_threadsafe(_wakeup.set)
+    return str(result.inserted_id)
+
+def update_progress(task_id, completed: int = 0, failed: int = 0, error: dict = None,
+                    errors: list = None, checkpoint=None):
+    """
+    Increment a task's progress counters and extend its lease. A handler that
+    passes a `checkpoint` (any BSON value marking how far it got) finds it in
+    task["checkpoint"] when the task is retried, with the progress counted up
+    to that point kept; it should then record progress only together with
+    checkpoints, so the two stay in step.
+    """
+    errors = list(errors or [])
+    if error is not None:
+        errors.append(error)
+    update = {
+        "$inc": {"completed": completed, "failed": failed},
+        "$set": {"lease_expires_at": _now() + timedelta(seconds=TASK_LEASE_SECONDS)},
+    }
+    if checkpoint is not None:
+        update["$set"]["checkpoint"] = checkpoint
+    if errors:
+        update["$push"] = {"errors": {"$each": errors}}
+    db.tasks.update_one({"_id": task_id}, update)
+
+def get_task(task_id) -> dict:
+    return db.tasks.find_one({"_id": task_id})
+
+def find_active_task(task_type: str, user_id: str) -> dict:
+    """A user's queued or running task of a type, if any."""
+    return db.tasks.find_one({"type": task_type, "user_id": user_id, "status": {"$in": ["queued", "running"]}})
+
+def _claim_next_task():
+    """Atomically move the oldest runnable task to 'running'."""
+    now = _now()
+    task = db.tasks.find_one_and_update(
+        {"$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_expires_at": {"$lt": now}},
+        ]},
+        {"$set": {
+            "status": "running",
+            "started_at": now,
+            "lease_expires_at": now + timedelta(seconds=TASK_LEASE_SECONDS),
+        }},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+    if task is not None and "checkpoint" not in task and (task["completed"] or task["failed"] or task["errors"]):
+        # A retried task without a checkpoint starts its progress over
+        progress = {"completed": 0, "failed": 0, "errors": []}
+        db.tasks.update_one({"_id": task["_id"]}, {"$set": progress})
+        task.update(progress)
+    return task
+
+def _finish_task(task_id, status: str, error: str = None):
+    update = {"status": status, "finished_at": _now()}
+    if error is not None:
+        update["error"] = error
+    db.tasks.update_one({"_id": task_id}, {"$set": update, "$unset": {"active_key": ""}})
+
+def _requeue_task(task_id):
+    db.tasks.update_one({"_id": task_id, "status": "running"}, {"$set": {"status": "queued"}})
+
+async def _run_task(task: dict):
+    handler = _handlers.get(task["type"])
+    if handler is None:
+        await run_in_threadpool(_finish_task, task["_id"], "failed", f"Unknown task type '{task['type']}'")
+        return
+    try:
+        await handler(task)
+    except asyncio.CancelledError:
+        # Shutting down: hand the task to another worker right away instead of
+        # leaving it to its lease
+        _requeue_task(task["_id"])
+        raise
+    except Exception as e:
+        await run_in_threadpool(_finish_task, task["_id"], "failed", str(e))
+    else:
+        await run_in_threadpool(_finish_task, task["_id"], "completed")
+
+async def _worker_loop():
+    while not _stopping:
+        try:
+            task = await run_in_threadpool(_claim_next_task)
+        except Exception as e:
+            print(f"Task queue error: {e}")
+            task = None
+
+        if task is not None:
+            await _run_task(task)
+            continue
+
+        # Nothing to do: sleep until the next poll or until a task is enqueued locally
+        _wakeup.clear()
+        if _stopping:
+            break
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=TASK_POLL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+def start_workers(count: int = TASK_WORKERS):
+    """Start the background workers on the running event loop (called on app startup)."""
+    global _wakeup, _loop, _stopping
+    _stopping = False
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    for _ in range(count):
+        _workers.append(asyncio.create_task(_worker_loop()))
+
+async def stop_workers(timeout: float = 0):
+    """
+    Stop the background workers: no new tasks are claimed, and running tasks get
+    `timeout` seconds to finish. Tasks still running then are cancelled and
+    queued again for another process.
+    """
+    global _stopping, _wakeup, _loop
+    _stopping = True
+    if _wakeup is not None:
+        _wakeup.set()
+    if _workers and timeout > 0:
+        await asyncio.wait(_workers, timeout=timeout)
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    # Tasks enqueued from now on wait for the next process to poll
+    _wakeup = _loop = None
@@ -0,0 +1,37 @@
+# backend/task_router.py
+
+from fastapi import APIRouter, HTTPException, Depends
+from bson import ObjectId
+from user_router import get_current_user
+from task_queue import get_task
+
+task_router = APIRouter()
+
+@task_router.get("/{task_id}")
+def get_task_status(task_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Report the status and progress of a background task
+    (e.g. skill extraction queued by an upload).
+    """
+    task = get_task(ObjectId(task_id)) if ObjectId.is_valid(task_id) else None
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task.get("user_id") != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Not authorized to access this task")
+
+    total = task.get("total", 0)
+    done = task.get("completed", 0) + task.get("failed", 0)
+    return {
+        "task_id": task_id,
+        "type": task["type"],
+        "status": task["status"],
+        "total": total,
+        "completed": task.get("completed", 0),
+        "failed": task.get("failed", 0),
+        "progress": done / total if total else (1.0 if task["status"] == "completed" else 0.0),
+        "errors": task.get("errors", []),
+        "error": task.get("error"),
+        "created_at": task.get("created_at"),
+        "started_at": task.get("started_at"),
+        "finished_at": task.get("finished_at"),
+    }
@@ -0,0 +1,11 @@
+# backend/tests/conftest.py
+#
+# Unit tests for the pure parts of the backend (no MongoDB or OpenAI needed):
+#   pip install -r tests/requirements.txt
+#   cd backend && python -m pytest -q tests
+
+import os
+import sys
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
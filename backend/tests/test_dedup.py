@@ -0,0 +1,60 @@
+# backend/tests/test_dedup.py
+
+import random
+import numpy as np
+import dedup
+from skill_cache import normalize_text
+
+def _words(seed: int, count: int) -> list:
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(100000)}" for _ in range(count)]
+
+def _jaccard(a: str, b: str) -> float:
+    def shingles(text):
+        words = normalize_text(text).split()
+        return {" ".join(words[i:i + dedup.SHINGLE_WORDS]) for i in range(len(words) - dedup.SHINGLE_WORDS + 1)}
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+def _estimate(a: str, b: str) -> float:
+    return float(np.mean(dedup.minhash(a) == dedup.minhash(b)))
+
+def _shared_bands(a: str, b: str) -> int:
+    return len(set(dedup._bands(dedup.minhash(a))) & set(dedup._bands(dedup.minhash(b))))
+
+def test_signature_ignores_case_and_whitespace():
+    text = " ".join(_words(1, 100))
+    assert np.array_equal(dedup.minhash(text), dedup.minhash("  " + text.upper().replace(" ", "\n")))
+
+def test_estimate_tracks_jaccard_similarity():
+    words = _words(2, 400)
+    base = " ".join(words)
+    near = " ".join(words[:380] + _words(3, 20))
+    far = " ".join(words[:100] + _words(4, 300))
+    for other in (near, far):
+        assert abs(_estimate(base, other) - _jaccard(base, other)) < 0.15
+
+def test_near_duplicate_passes_threshold_and_unrelated_text_does_not():
+    words = _words(5, 400)
+    base = " ".join(words)
+    near = " ".join(words[:390] + _words(6, 10))
+    unrelated = " ".join(_words(7, 400))
+    assert _jaccard(base, near) >= 0.9
+    assert _estimate(base, near) >= dedup.NEAR_DUPLICATE_JACCARD
+    assert _estimate(base, unrelated) < 0.1
+
+def test_lsh_bands_make_near_duplicates_candidates():
+    words = _words(8, 400)
+    base = " ".join(words)
+    assert _shared_bands(base, base) == dedup.MINHASH_BANDS
+    assert _shared_bands(base, " ".join(words[:390] + _words(9, 10))) > 0
+    assert _shared_bands(base, " ".join(_words(10, 400))) == 0
+
+def test_fingerprint_fields_skip_minhash_for_short_texts():
+    short = " ".join(_words(11, dedup.NEAR_DUPLICATE_MIN_WORDS - 1))
+    long = " ".join(_words(12, dedup.NEAR_DUPLICATE_MIN_WORDS))
+    assert set(dedup.fingerprint_fields(short)) == {"text_sha256"}
+    fields = dedup.fingerprint_fields(long, "abc")
+    assert set(fields) == {"text_sha256", "content_sha256", "minhash", "minhash_bands"}
+    assert len(fields["minhash_bands"]) == dedup.MINHASH_BANDS
+    assert fields["text_sha256"] == dedup.fingerprint_fields(long.upper())["text_sha256"]
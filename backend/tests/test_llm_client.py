@@ -0,0 +1,82 @@
+# backend/tests/test_llm_client.py
+
+import asyncio
+import time
+from llm_client import CircuitBreaker, TokenBucket, parse_duration
+
+def _expire(breaker: CircuitBreaker):
+    breaker.opened_at -= breaker.reset_seconds
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    _expire(breaker)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_failed_trial_opens_the_breaker_again():
+    breaker = CircuitBreaker(failure_threshold=5, reset_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+    _expire(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.trial_in_flight
+
+def _elapsed(coroutine) -> float:
+    async def run():
+        start = time.monotonic()
+        await coroutine()
+        return time.monotonic() - start
+    return asyncio.run(run())
+
+def test_bucket_spends_its_burst_then_waits_for_refill():
+    bucket = TokenBucket(per_minute=600)  # 10 per second
+
+    async def take():
+        await bucket.acquire(600)
+        await bucket.acquire(2)
+
+    assert 0.15 <= _elapsed(take) < 1.0
+
+def test_unlimited_bucket_only_enforces_pauses():
+    bucket = TokenBucket(per_minute=0)
+
+    async def burst():
+        for _ in range(1000):
+            await bucket.acquire(100)
+
+    assert _elapsed(burst) < 0.5
+    bucket.pause(0.2)
+    assert _elapsed(bucket.acquire) >= 0.15
+
+def test_sync_adopts_a_lower_remaining_budget_and_pauses_at_zero():
+    bucket = TokenBucket(per_minute=600)
+    bucket.sync(5, None)
+    assert bucket.tokens <= 5
+    bucket.sync(0, 0.2)
+    assert bucket.blocked_until > time.monotonic() + 0.1
+    bucket.sync(None, 5)
+    assert bucket.blocked_until < time.monotonic() + 1
+
+def test_parse_duration():
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("1.5s") == 1.5
+    assert parse_duration("12") == 12
+    assert parse_duration("soon") is None
+    assert parse_duration(None) is None
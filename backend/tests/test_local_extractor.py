@@ -0,0 +1,24 @@
+# backend/tests/test_local_extractor.py
+
+from local_extractor import AhoCorasick, LocalSkillExtractor
+
+def test_reports_every_overlapping_occurrence():
+    automaton = AhoCorasick({"he": "he", "she": "she", "his": "his", "hers": "hers"})
+    assert sorted(automaton.search("ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+def test_follows_failure_links_across_partial_matches():
+    automaton = AhoCorasick({"abcd": 1, "bc": 2, "c": 3})
+    assert sorted(automaton.search("abcabcd")) == [(1, 3, 2), (2, 3, 3), (3, 7, 1), (4, 6, 2), (5, 6, 3)]
+
+def test_no_patterns_no_matches():
+    assert list(AhoCorasick({}).search("anything")) == []
+
+def test_extractor_matches_whole_words_only():
+    extractor = LocalSkillExtractor({"java": [], "sql": ["structured query language"]}, ambiguous=set())
+    assert extractor.extract("JavaScript and MySQL") == []
+    assert extractor.extract("Java,  Structured\nQuery Language and SQL") == ["java", "sql"]
+
+def test_ambiguous_names_only_match_through_aliases():
+    extractor = LocalSkillExtractor({"go": ["golang"], "python": []}, ambiguous={"go"})
+    assert extractor.extract("Ready to go with Python") == ["python"]
+    assert extractor.extract("Golang and Python") == ["go", "python"]
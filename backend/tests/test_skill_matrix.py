@@ -0,0 +1,43 @@
+# backend/tests/test_skill_matrix.py
+
+import random
+from skill_matrix import SkillMatrix
+
+def _matrix(count: int = 60, seed: int = 1) -> SkillMatrix:
+    rng = random.Random(seed)
+    skills = [rng.sample(range(1, 9), rng.randrange(0, 5)) for _ in range(count)]
+    return SkillMatrix([f"r{i}" for i in range(count)], [f"r{i}.pdf" for i in range(count)], skills), skills
+
+def test_ranks_by_overlap_then_row_order():
+    matrix, skills = _matrix()
+    job = {1, 2, 3}
+    results = matrix.top_matches([job], 100)[0]
+    expected = sorted(
+        (i for i, resume in enumerate(skills) if job & set(resume)),
+        key=lambda i: (-len(job & set(skills[i])), i)
+    )
+    assert [r["resume_id"] for r in results] == [f"r{i}" for i in expected]
+    for r in results:
+        resume = set(skills[int(r["resume_id"][1:])])
+        assert sorted(r["matched_skills"]) == sorted(job & resume)
+        assert r["overlap_score"] == len(job & resume) / len(job)
+
+def test_pages_with_different_limits_line_up():
+    matrix, _ = _matrix()
+    full = [r["resume_id"] for r in matrix.top_matches([{1, 2, 3}], 100)[0]]
+    for limit in range(1, len(full) + 1):
+        assert [r["resume_id"] for r in matrix.top_matches([{1, 2, 3}], limit)[0]] == full[:limit]
+    pages = [full[offset:offset + 7] for offset in range(0, len(full), 7)]
+    assert sum(pages, []) == full
+
+def test_one_result_list_per_job_and_unknown_skills_match_nothing():
+    matrix, _ = _matrix()
+    results = matrix.top_matches([{1}, {99}, set()], 5)
+    assert len(results) == 3
+    assert len(results[0]) == 5
+    assert results[1] == [] and results[2] == []
+
+def test_empty_matrix():
+    matrix = SkillMatrix([], [], [])
+    assert matrix.top_matches([{1}], 5) == [[]]
+    assert matrix.top_matches([], 5) == []
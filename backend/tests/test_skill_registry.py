@@ -0,0 +1,30 @@
+# backend/tests/test_skill_registry.py
+
+from skill_registry import MAX_SKILL_LENGTH, canonicalize, normalize_skill, split_skills
+
+def test_spelling_variants_map_to_the_canonical_name():
+    assert canonicalize(["K8s", "Amazon Web Services", "unit tests", "ReactJS", "postgres"]) == [
+        "kubernetes", "aws", "unit testing", "react", "postgresql"
+    ]
+
+def test_separator_and_case_differences_are_ignored():
+    assert canonicalize(["Scikit Learn", "scikit_learn", "SCIKIT-LEARN"]) == ["scikit-learn"]
+
+def test_related_tools_stay_separate():
+    skills = ["pytest", "Helm", "GitHub", "Keras", "Scrum", "Confluence", "Ubuntu", "OpenSearch"]
+    assert canonicalize(skills) == [
+        "pytest", "helm", "github", "keras", "scrum", "confluence", "ubuntu", "opensearch"
+    ]
+    assert not {"unit testing", "kubernetes", "git", "tensorflow", "agile", "jira", "linux"} & set(canonicalize(skills))
+
+def test_unknown_skills_are_cleaned_up_and_kept():
+    assert normalize_skill("  *Prompt   Engineering.* ") == "prompt engineering"
+
+def test_unusable_entries_are_dropped_and_duplicates_removed_in_order():
+    skills = ["Python", None, 3, "", "python3", "x" * (MAX_SKILL_LENGTH + 1), "SQL", "python"]
+    assert canonicalize(skills) == ["python", "sql"]
+    assert canonicalize(None) == []
+
+def test_split_skills_of_an_unparsed_reply():
+    parts = split_skills("```json\nPython, SQL\n- React | Docker")
+    assert canonicalize(parts) == ["python", "sql", "react", "docker"]
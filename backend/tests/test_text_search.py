@@ -0,0 +1,45 @@
+# backend/tests/test_text_search.py
+
+import text_search
+from text_search import parse_query, snippet
+
+def test_plain_words_are_optional():
+    assert parse_query("python java") == ([], ["python", "java"], [])
+
+def test_and_makes_both_sides_required():
+    assert parse_query("kubernetes AND go AND fintech") == (["kubernetes", "go", "fintech"], [], [])
+
+def test_prefixes_and_not():
+    assert parse_query("python -php") == ([], ["python"], ["php"])
+    assert parse_query("+react NOT angular") == (["react"], [], ["angular"])
+
+def test_required_wins_over_optional_and_duplicates_are_dropped():
+    assert parse_query("python +python sql sql") == (["python"], ["sql"], [])
+
+def test_stopwords_operators_and_lone_signs_yield_no_terms():
+    assert parse_query("the AND of NOT") == ([], [], [])
+    assert parse_query("+ -") == ([], [], [])
+
+def test_terms_keep_language_punctuation():
+    assert parse_query("C++ Node.js c#") == ([], ["c++", "node.js", "c#"], [])
+
+def test_snippet_of_short_text_is_the_whole_text():
+    result = snippet("Senior Python developer", {"python"})
+    assert result["snippet"] == "Senior Python developer"
+    assert result["highlights"] == [[7, 13]]
+
+def test_snippet_centres_on_the_passage_with_most_terms():
+    filler = " ".join(["lorem"] * 200)
+    text = f"python {filler} kubernetes and golang on aws {filler}"
+    result = snippet(text, {"kubernetes", "golang", "python"})
+    passage = result["snippet"]
+    assert passage.startswith("…") and passage.endswith("…")
+    assert len(passage) <= text_search.SNIPPET_CHARS + 2
+    highlighted = [passage[start:end].lower() for start, end in result["highlights"]]
+    assert highlighted == ["kubernetes", "golang"]
+
+def test_snippet_without_hits_starts_at_the_beginning():
+    text = " ".join(["lorem"] * 200)
+    result = snippet(text, {"python"})
+    assert result["highlights"] == []
+    assert not result["snippet"].startswith("…") and result["snippet"].endswith("…")
@@ -0,0 +1,272 @@
+# backend/text_search.py
+
+import math
+import os
+import re
+from collections import Counter
+from pymongo import ASCENDING
+from db import db
+from skill_cache import normalize_text
+import resume_blobs
+
+# Ranked full-text search over resume text with an inverted index kept in Mongo:
+#   resume_terms:     one posting per (resume, term)
+#                     {"user_id": ..., "term": "kubernetes", "resume_id": ObjectId, "tf": 3, "length": 412}
+#   search_documents: {"_id": resume_id, "user_id": ..., "length": 412}  (indexed token count)
+#   search_stats:     {"_id": user_id, "documents": 1200, "total_length": 480000}
+# Postings are written when a resume's text is stored and removed with the resume
+# (see resume_pipeline and resume_router), and scored with Okapi BM25. The
+# (user_id, term, resume_id, tf, length) index covers the posting queries, so a
+# search reads index entries only - never the resumes - until it builds snippets
+# for the returned page. Duplicate links (see dedup) have no text and are not indexed.
+#
+# Queries: plain words are optional and ranked ("python java"); AND, a leading "+"
+# or NOT / a leading "-" make a word required or excluded
+# ("kubernetes AND go AND fintech", "python -php", "+react NOT angular").
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "200"))
+# Once required terms narrowed the candidates to at most this many resumes, the
+# postings of the remaining terms are only read for those candidates.
+CANDIDATE_FILTER_LIMIT = 1000
+REBUILD_BATCH_SIZE = 500
+MAX_TERM_LENGTH = 40
+
+# Words with letters/digits, keeping the "+", "#" and inner "." of c++, c#, node.js
+_TOKEN = re.compile(r"[a-z0-9](?:[a-z0-9+#]|\.(?=[a-z0-9]))*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is of on or the to was were with".split()
+)
+
+def ensure_indexes():
+    db.resume_terms.create_index([
+        ("user_id", ASCENDING), ("term", ASCENDING), ("resume_id", ASCENDING), ("tf", ASCENDING), ("length", ASCENDING)
+    ])
+    db.resume_terms.create_index("resume_id")
+    db.search_documents.create_index("user_id")
+
+def tokenize(text: str) -> list:
+    return [
+        token for token in _TOKEN.findall(normalize_text(text))
+        if token not in STOPWORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+# ---- indexing ----
+
+def _remove(resume_ids: list):
+    """Drop the postings of resumes and take them out of their users' statistics."""
+    documents = list(db.search_documents.find({"_id": {"$in": resume_ids}}, {"user_id": 1, "length": 1}))
+    if not documents:
+        return
+    db.resume_terms.delete_many({"resume_id": {"$in": resume_ids}})
+    db.search_documents.delete_many({"_id": {"$in": [doc["_id"] for doc in documents]}})
+    removed = {}
+    for doc in documents:
+        count, length = removed.get(doc["user_id"], (0, 0))
+        removed[doc["user_id"]] = (count + 1, length + doc["length"])
+    for user_id, (count, length) in removed.items():
+        db.search_stats.update_one({"_id": user_id}, {"$inc": {"documents": -count, "total_length": -length}})
+
+def index_resumes(resumes: list):
+    """(Re)index the text of resumes. Each needs '_id', 'user_id' and 'resume_text'."""
+    if not resumes:
+        return
+    _remove([resume["_id"] for resume in resumes])
+    postings, documents, added = [], [], {}
+    for resume in resumes:
+        counts = Counter(tokenize(resume.get("resume_text") or ""))
+        length = sum(counts.values())
+        user_id = resume["user_id"]
+        documents.append({"_id": resume["_id"], "user_id": user_id, "length": length})
+        postings.extend(
+            {"user_id": user_id, "term": term, "resume_id": resume["_id"], "tf": tf, "length": length}
+            for term, tf in counts.items()
+        )
+        count, total = added.get(user_id, (0, 0))
+        added[user_id] = (count + 1, total + length)
+    if postings:
+        db.resume_terms.insert_many(postings, ordered=False)
+    db.search_documents.insert_many(documents, ordered=False)
+    for user_id, (count, length) in added.items():
+        db.search_stats.update_one(
+            {"_id": user_id}, {"$inc": {"documents": count, "total_length": length}}, upsert=True
+        )
+
+def index_resume(resume: dict):
+    index_resumes([resume])
+
+def remove_resume(resume_id):
+    _remove([resume_id])
+
+def rebuild_user_index(user_id: str) -> int:
+    """Rebuild the text index of every resume owned by a user. Returns the resume count."""
+    db.resume_terms.delete_many({"user_id": user_id})
+    db.search_documents.delete_many({"user_id": user_id})
+    db.search_stats.delete_one({"_id": user_id})
+    cursor = db.resumes.find(
+        {"user_id": user_id, "duplicate_of": {"$exists": False}}, {"user_id": 1, "resume_text": 1}
+    ).batch_size(REBUILD_BATCH_SIZE)
+    total, batch = 0, []
+    for resume in cursor:
+        batch.append(resume)
+        if len(batch) == REBUILD_BATCH_SIZE:
+            index_resumes(resume_blobs.attach_texts(batch))
+            total, batch = total + len(batch), []
+    index_resumes(resume_blobs.attach_texts(batch))
+    return total + len(batch)
+
+# ---- querying ----
+
+def parse_query(query: str):
+    """Split a query into (required, optional, excluded) lists of index terms."""
+    clauses = []  # [terms, mode]
+    negate = join = False
+    for word in query.split():
+        if word in ("AND", "OR", "NOT"):
+            if word == "NOT":
+                negate = True
+            elif word == "AND":
+                join = True
+                if clauses and clauses[-1][1] == "optional":
+                    clauses[-1][1] = "required"
+            continue
+        mode = "optional"
+        if len(word) > 1 and word[0] in "+-":
+            mode = "required" if word[0] == "+" else "excluded"
+            word = word[1:]
+        if negate:
+            mode = "excluded"
+        elif join and mode == "optional":
+            mode = "required"
+        terms = tokenize(word)
+        if terms:
+            clauses.append([terms, mode])
+        negate = join = False
+
+    groups = {"required": [], "optional": [], "excluded": []}
+    for terms, mode in clauses:
+        for term in terms:
+            if term not in groups[mode]:
+                groups[mode].append(term)
+    # A term both required and optional is just required
+    groups["optional"] = [term for term in groups["optional"] if term not in groups["required"]]
+    return groups["required"], groups["optional"], groups["excluded"]
+
+def _postings(user_id: str, term: str, candidates: set = None) -> list:
+    query = {"user_id": user_id, "term": term}
+    if candidates is not None and len(candidates) <= CANDIDATE_FILTER_LIMIT:
+        query["resume_id"] = {"$in": list(candidates)}
+    # Covered by the (user_id, term, resume_id, tf, length) index
+    return list(db.resume_terms.find(query, {"_id": 0, "resume_id": 1, "tf": 1, "length": 1}))
+
+def _document_frequency(user_id: str, term: str) -> int:
+    return db.resume_terms.count_documents({"user_id": user_id, "term": term})
+
+def rank(user_id: str, required: list, optional: list, excluded: list) -> list:
+    """All of a user's resumes matching the parsed query as [(resume_id, score)], best first."""
+    stats = db.search_stats.find_one({"_id": user_id}) or {}
+    documents = stats.get("documents", 0)
+    if not documents or not (required or optional):
+        return []
+    average_length = stats["total_length"] / documents or 1.0
+
+    frequencies = {term: _document_frequency(user_id, term) for term in required + optional}
+    if any(frequencies[term] == 0 for term in required):
+        return []
+
+    scores = {}
+    candidates = None
+    # Rarest required term first, so the candidate set shrinks as fast as possible
+    for term in sorted(required, key=frequencies.get) + optional:
+        postings = _postings(user_id, term, candidates)
+        df = frequencies[term]
+        idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+        for posting in postings:
+            resume_id = posting["resume_id"]
+            if candidates is not None and resume_id not in candidates:
+                continue
+            tf = posting["tf"]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * posting["length"] / average_length)
+            scores[resume_id] = scores.get(resume_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        if term in required:
+            matched = {posting["resume_id"] for posting in postings}
+            candidates = matched if candidates is None else candidates & matched
+
+    if candidates is not None:
+        scores = {resume_id: score for resume_id, score in scores.items() if resume_id in candidates}
+    for term in excluded:
+        for posting in _postings(user_id, term, set(scores)):
+            scores.pop(posting["resume_id"], None)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+def snippet(text: str, terms: set) -> dict:
+    """
+    The SNIPPET_CHARS-long passage of text with the most distinct query terms, as
+    {"snippet": str, "highlights": [[start, end], ...]} with offsets into the snippet.
+    """
+    hits = [(m.start(), m.group().lower()) for m in _TOKEN.finditer(text) if m.group().lower() in terms]
+    start = 0
+    if hits:
+        best = -1
+        for i, (position, _) in enumerate(hits):
+            covered = {term for p, term in hits[i:] if p < position + SNIPPET_CHARS}
+            if len(covered) > best:
+                best, start = len(covered), position
+        # Some context before the first hit (more near the end of the text),
+        # starting at a word boundary
+        context = max(0, min(start - SNIPPET_CHARS // 5, len(text) - SNIPPET_CHARS))
+        boundary = text.find(" ", context, start)
+        start = boundary + 1 if context > 0 and boundary != -1 else context
+    end = min(len(text), start + SNIPPET_CHARS)
+    if end < len(text):
+        boundary = text.rfind(" ", start, end)
+        end = boundary if boundary > start else end
+
+    passage = _WHITESPACE.sub(" ", text[start:end]).strip()
+    passage = ("…" if start > 0 else "") + passage + ("…" if end < len(text) else "")
+    highlights = [
+        [m.start(), m.end()] for m in _TOKEN.finditer(passage) if m.group().lower() in terms
+    ]
+    return {"snippet": passage, "highlights": highlights}
+
+def search(user_id: str, query: str, limit: int = 20, offset: int = 0) -> dict:
+    """
+    One page of a user's resumes ranked by BM25 for the query. Returns
+    {"total": int, "results": [{"resume_id", "filename", "score", "snippet", "highlights"}]}.
+    Raises ValueError when the query has no searchable terms.
+    """
+    required, optional, excluded = parse_query(query)
+    if not (required or optional):
+        raise ValueError("Query has no searchable terms")
+    ranked = rank(user_id, required, optional, excluded)
+    page = ranked[offset:offset + limit]
+
+    resumes = {
+        resume["_id"]: resume
+        for resume in resume_blobs.attach_texts(list(db.resumes.find(
+            {"_id": {"$in": [resume_id for resume_id, _ in page]}}, {"filename": 1, "resume_text": 1}
+        )))
+    }
+    terms = set(required + optional)
+    results = []
+    for resume_id, score in page:
+        resume = resumes.get(resume_id)
+        if resume is None:
+            continue
+        results.append({
+            "resume_id": str(resume_id),
+            "filename": resume.get("filename"),
+            "score": round(score, 4),
+            **snippet(resume.get("resume_text") or "", terms),
+        })
+    return {"total": len(ranked), "results": results}
+
+if __name__ == "__main__":
+    # Backfill the text index for resumes stored before it existed:
+    #   python text_search.py
+    ensure_indexes()
+    user_ids = db.resumes.distinct("user_id")
+    total = sum(rebuild_user_index(user_id) for user_id in user_ids)
+    print(f"Indexed the text of {total} resumes for {len(user_ids)} users")
@@ -3,8 +3,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
-from passlib.hash import bcrypt
-from db import db
+from starlette.concurrency import run_in_threadpool
+import repositories
+from password_hashing import hash_password, verify_password
 import jwt
 import os
 from datetime import datetime, timedelta
@@ -35,37 +36,45 @@ def create_jwt_token(username: str) -> str:
     return token
 
 @user_router.post("/register")
-def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate):
     """Register a new user, store hashed password in DB."""
     # Check if user already exists
-    existing_user = db.users.find_one({"username": user_data.username})
+    existing_user = await run_in_threadpool(repositories.find_user, user_data.username)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    hashed_password = bcrypt.hash(user_data.password)
+    # Hashed on the dedicated bcrypt executor
+    hashed_password = await hash_password(user_data.password)
     new_user = {
         "username": user_data.username,
         "password": hashed_password,
         "email": user_data.email
     }
-    db.users.insert_one(new_user)
+    if not await run_in_threadpool(repositories.create_user, new_user):
+        # Lost a race with another registration (unique index on username)
+        raise HTTPException(status_code=400, detail="Username already exists")
 
     return {"message": "User registered successfully"}
 
 @user_router.post("/login")
-def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
     """User logs in with username & password. Return JWT if valid."""
     username = form_data.username
     password = form_data.password
 
-    user = db.users.find_one({"username": username})
+    user = await run_in_threadpool(repositories.find_user, username, True)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
-    # Verify password
-    if not bcrypt.verify(password, user["password"]):
+    # Verify password (on the dedicated bcrypt executor)
+    valid, new_hash = await verify_password(password, user["password"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
+    # Hashing parameters changed since this hash was made: upgrade it now
+    if new_hash:
+        await run_in_threadpool(repositories.update_user, username, {"password": new_hash})
+
     # Create JWT
     token = create_jwt_token(username)
     return {"access_token": token, "token_type": "bearer"}
@@ -82,7 +91,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Could not validate token")
 
-    user = db.users.find_one({"username": username})
+    user = repositories.find_user_cached(username)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
 
@@ -0,0 +1,64 @@
+# backend/vector_index.py
+
+import os
+import numpy as np
+
+# Below this many vectors a single list is searched exactly; above it an
+# inverted-file (IVF) index only scans the VECTOR_INDEX_NPROBE closest clusters.
+EXACT_SEARCH_THRESHOLD = int(os.getenv("VECTOR_INDEX_EXACT_THRESHOLD", "2048"))
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "16"))
+KMEANS_ITERATIONS = 10
+
+class IVFIndex:
+    """
+    Inverted-file nearest-neighbour index over unit vectors (cosine similarity).
+    Vectors are clustered with spherical k-means; a query scores the centroids,
+    then only the vectors in the nprobe best clusters.
+    """
+
+    def __init__(self, vectors: np.ndarray, ids: list, nprobe: int = VECTOR_INDEX_NPROBE):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.ids = ids
+        self.nprobe = nprobe
+
+        if len(ids) <= EXACT_SEARCH_THRESHOLD:
+            self.centroids = None
+            self.lists = [np.arange(len(ids))]
+            return
+
+        nlist = int(np.sqrt(len(ids)))
+        self.centroids, assignment = self._kmeans(nlist)
+        self.lists = [np.flatnonzero(assignment == c) for c in range(nlist)]
+
+    def _kmeans(self, nlist: int):
+        rng = np.random.default_rng(0)
+        centroids = self.vectors[rng.choice(len(self.vectors), nlist, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(self.vectors @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = self.vectors[assignment == c]
+                if len(members):
+                    center = members.sum(axis=0)
+                    centroids[c] = center / (np.linalg.norm(center) or 1.0)
+        return centroids, np.argmax(self.vectors @ centroids.T, axis=1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query: np.ndarray, k: int) -> list:
+        """Return up to k (id, similarity) pairs, most similar first."""
+        if not self.ids or k <= 0:
+            return []
+        if self.centroids is None:
+            candidates = self.lists[0]
+        else:
+            probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            candidates = np.concatenate([self.lists[c] for c in probe])
+        if len(candidates) == 0:
+            return []
+
+        scores = self.vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[candidates[i]], float(scores[i])) for i in top]